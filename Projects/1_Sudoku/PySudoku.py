@@ -1,55 +1,201 @@
-import sys, os, random, pygame
-sys.path.append(os.path.join("objects"))
+import sys, os, pygame
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, "objects"))
 import SudokuSquare
 from utils import *
 from GameResources import *
 
 
-def play(values, result, history):
-    assignments = reconstruct(result, history)
-    pygame.init()
+def square_position(x, y):
+    """The top left corner of the square in column x and row y of the board image """
+    if x in (0, 1, 2):  startX = (x * 57) + 38
+    if x in (3, 4, 5):  startX = (x * 57) + 99
+    if x in (6, 7, 8):  startX = (x * 57) + 159
 
-    size = width, height = 700, 700
-    screen = pygame.display.set_mode(size)
+    if y in (0, 1, 2):  startY = (y * 57) + 35
+    if y in (3, 4, 5):  startY = (y * 57) + 100
+    if y in (6, 7, 8):  startY = (y * 57) + 165
+    return startX, startY
 
-    background_image = pygame.image.load("./images/sudoku-board-bare.jpg").convert()
 
-    clock = pygame.time.Clock()
+def _has_pillow():
+    try:
+        import PIL
+    except ImportError:
+        return False
+    return True
 
-    while True:
-        pygame.event.pump()
-        theSquares = []
-        initXLoc = 0
-        initYLoc = 0
-        startX, startY, editable, number = 0, 0, "N", 0
+
+def _number(value):
+    if len(value) > 1 or value == '' or value == '.':
+        return None
+    return int(value)
+
+
+class Renderer:
+    """Draws a board once and then only the squares that change
+
+    Parameters
+    ----------
+    values(dict)
+        the starting board, a dictionary of the form {'box_name': '123456789', ...}
+
+    headless(bool)
+        if True, render off-screen with SDL's dummy video driver, so that no
+        display is needed (set before pygame opens its display)
+
+    size(tuple)
+        the window size in pixels
+    """
+    def __init__(self, values, headless=False, size=(700, 700)):
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.init()
+        self.screen = pygame.display.set_mode(size)
+        self.background = pygame.image.load(os.path.join(HERE, "images", "sudoku-board-bare.jpg")).convert()
+        self.values = dict(values)
+        self.squares = {}
         for y in range(9):
             for x in range(9):
-                if x in (0, 1, 2):  startX = (x * 57) + 38
-                if x in (3, 4, 5):  startX = (x * 57) + 99
-                if x in (6, 7, 8):  startX = (x * 57) + 159
-
-                if y in (0, 1, 2):  startY = (y * 57) + 35
-                if y in (3, 4, 5):  startY = (y * 57) + 100
-                if y in (6, 7, 8):  startY = (y * 57) + 165
-                string_number = values[rows[y] + cols[x]]
-                if len(string_number) > 1 or string_number == '' or string_number == '.':
-                    number = None
+                box = rows[y] + cols[x]
+                startX, startY = square_position(x, y)
+                self.squares[box] = SudokuSquare.SudokuSquare(_number(self.values[box]), startX, startY, "N", x, y)
+        self.screen.blit(self.background, (0, 0))
+        for square in self.squares.values():
+            square.draw()
+        pygame.display.flip()
+        self.dirty = []
+
+    def assign(self, box, value):
+        """Show `value` in `box`; the square is redrawn on the next `flush` """
+        if self.values[box] == value:
+            return
+        self.values[box] = value
+        square = self.squares[box]
+        square.set(_number(value))
+        rect = pygame.Rect(square.offsetX, square.offsetY, 45, 40)
+        self.screen.blit(self.background, rect, rect)
+        self.dirty.append(square.draw())
+
+    def flush(self):
+        """Push the squares redrawn since the last flush to the display """
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+
+    def frame(self, rect=None):
+        """The current board, or the part of it inside `rect`, as an RGB
+        `PIL.Image` (needs Pillow)
+        """
+        from PIL import Image
+        surface = self.screen if rect is None else self.screen.subsurface(rect)
+        return Image.frombytes("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB"))
+
+    def replay(self, assignments, fps=5, per_frame=1, frames_dir=None, gif=None, gif_duration=None,
+               frame_format="png"):
+        """Animate a sequence of (box, value) assignments
+
+        Parameters
+        ----------
+        assignments(list)
+            (box, value) pairs, e.g. from `utils.reconstruct`
+
+        fps(int)
+            frames per second; 0 renders as fast as possible
+
+        per_frame(int)
+            assignments shown per frame
+
+        frames_dir(string)
+            if given, every frame is saved there as frame_00000.png, ...
+
+        gif(string)
+            if given, the frames are saved as an animated GIF at this path
+            (needs Pillow)
+
+        gif_duration(int)
+            milliseconds per GIF frame (defaults to 1000 / fps, or 100 if fps is 0)
+
+        frame_format(string)
+            the image format of the saved frames, e.g. "png" or "bmp" (fastest)
+
+        Returns
+        -------
+        int
+            the number of frames rendered
+        """
+        clock = pygame.time.Clock()
+        frames = []
+        if frames_dir:
+            os.makedirs(frames_dir, exist_ok=True)
+
+        def emit(n):
+            dirty = self.dirty
+            self.flush()
+            if frames_dir:
+                path = os.path.join(frames_dir, "frame_{:05d}.{}".format(n, frame_format))
+                if frame_format == "png" and _has_pillow():
+                    # Pillow's fastest PNG compression is several times quicker than pygame's encoder
+                    self.frame().save(path, compress_level=1)
                 else:
-                    number = int(string_number)
-                theSquares.append(SudokuSquare.SudokuSquare(number, startX, startY, editable, x, y))
+                    pygame.image.save(self.screen, path)
+            if gif:
+                if not frames:
+                    frames.append(self.frame().quantize(64))
+                else:
+                    # start from the previous frame and paste in only the squares that changed
+                    image = frames[-1].copy()
+                    for rect in dirty:
+                        patch = self.frame(rect).quantize(palette=frames[0], dither=0)
+                        image.paste(patch, rect.topleft)
+                    frames.append(image)
+            clock.tick(fps)
 
-        screen.blit(background_image, (0, 0))
-        for num in theSquares:
-            num.draw()
+        emit(0)
+        count = 1
+        for i in range(0, len(assignments), per_frame):
+            pygame.event.pump()
+            for box, value in assignments[i:i + per_frame]:
+                self.assign(box, value)
+            emit(count)
+            count += 1
+        if gif:
+            if gif_duration is None:
+                gif_duration = int(1000 / fps) if fps else 100
+            frames[0].save(gif, save_all=True, append_images=frames[1:], loop=0, duration=gif_duration)
+        return count
 
-        pygame.display.flip()
-        pygame.display.update()
-        clock.tick(5)
 
-        if len(assignments) == 0:
-            break
-        box, value = assignments.pop()
-        values[box] = value
+def export(values, result, history, frames_dir=None, gif=None, fps=10, per_frame=1):
+    """Render the replay of a solve off-screen, to PNG frames and/or a GIF
+    (see `Renderer.replay` for the options)
+
+    Parameters
+    ----------
+    values(dict)
+        the starting board
+
+    result(dict)
+        the solved board
+
+    history(list)
+        the (box, value) trail recorded while solving
+
+    Returns
+    -------
+    int
+        the number of frames rendered
+    """
+    renderer = Renderer(values, headless=True)
+    # fps only sets the GIF timing; off-screen frames are rendered as fast as possible
+    return renderer.replay(reconstruct(result, history), fps=0, per_frame=per_frame,
+                           frames_dir=frames_dir, gif=gif, gif_duration=int(1000 / fps) if fps else 100)
+
+
+def play(values, result, history, fps=5):
+    assignments = reconstruct(result, history)
+    renderer = Renderer(values)
+    renderer.replay(assignments, fps=fps)
 
     # leave game showing until closed by user
     while True:
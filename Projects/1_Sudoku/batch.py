@@ -0,0 +1,88 @@
+"""Solve many Sudoku puzzles at once across a pool of worker processes."""
+from functools import partial
+from multiprocessing import Pool
+
+import utils
+from solution import solve
+
+
+def _init_worker():
+    # workers inherit the parent's module-level history on fork; nobody replays it
+    utils.history.disable()
+    utils.history.clear()
+
+
+def _solve_indexed(job, backend):
+    index, grid = job
+    return index, solve(grid, backend=backend)
+
+
+def solve_many(grids, workers=None, chunksize=1, backend='dict', collector=None):
+    """Solve a collection of Sudoku puzzles using a pool of worker processes
+
+    Parameters
+    ----------
+    grids(iterable)
+        strings representing sudoku grids
+
+    workers(int)
+        number of worker processes (defaults to the number of CPUs); with a
+        single worker the puzzles are solved in the calling process
+
+    chunksize(int)
+        number of puzzles sent to a worker at a time
+
+    backend(string)
+        the `solution.solve` backend used by the workers
+
+    collector(StatsCollector)
+        if given, the `stats.SolveStats` of every solve are added to it
+
+    Returns
+    -------
+    list
+        the result of `solution.solve` for each grid, in input order
+    """
+    solver = partial(solve, backend=backend, stats=collector is not None)
+    if workers == 1:
+        results = [solver(grid) for grid in grids]
+    else:
+        with Pool(workers, initializer=_init_worker) as pool:
+            results = list(pool.imap(solver, grids, chunksize))
+    if collector is None:
+        return results
+    for result, stats in results:
+        collector.add(stats)
+    return [result for result, stats in results]
+
+
+def imap_solve(grids, workers=None, chunksize=1, backend='dict'):
+    """Solve a collection of Sudoku puzzles, yielding results as they finish
+
+    Parameters
+    ----------
+    grids(iterable)
+        strings representing sudoku grids
+
+    workers(int)
+        number of worker processes (defaults to the number of CPUs); with a
+        single worker the puzzles are solved in the calling process
+
+    chunksize(int)
+        number of puzzles sent to a worker at a time
+
+    backend(string)
+        the `solution.solve` backend used by the workers
+
+    Yields
+    ------
+    tuple
+        (index, result) pairs in completion order, where index is the position
+        of the grid in the input and result is the return value of `solution.solve`
+    """
+    if workers == 1:
+        for index, grid in enumerate(grids):
+            yield index, solve(grid, backend=backend)
+        return
+    with Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap_unordered(partial(_solve_indexed, backend=backend), enumerate(grids), chunksize)
@@ -0,0 +1,244 @@
+"""Bitmask board representation for the Sudoku solver.
+
+A board is a flat list of 81 integers in the same order as `utils.boxes`. Bit
+``d - 1`` of an entry is set while digit ``d`` is still a candidate for that box,
+so the strategies reduce to integer AND/OR operations over precomputed index
+tables instead of string edits on a dictionary.
+"""
+from utils import boxes
+from solution import default_topology
+
+
+DIGITS = '123456789'
+ALL_DIGITS = (1 << len(DIGITS)) - 1
+BITS = [1 << i for i in range(len(DIGITS))]
+
+# lookup tables indexed by candidate mask
+POPCOUNT = [bin(mask).count('1') for mask in range(ALL_DIGITS + 1)]
+MASK_DIGITS = [''.join(d for d, bit in zip(DIGITS, BITS) if mask & bit) for mask in range(ALL_DIGITS + 1)]
+DIGITS_MASK = {digits: mask for mask, digits in enumerate(MASK_DIGITS)}
+
+# index tables: box positions for every unit, and the peer positions of every box
+INDEX = default_topology.index
+UNITS = default_topology.unit_index
+PEERS = default_topology.peer_index
+
+
+def values2board(values):
+    """Convert the dictionary board representation to a bitmask board
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    list
+        a list of 81 candidate masks in `utils.boxes` order
+    """
+    board = []
+    for box in boxes:
+        mask = DIGITS_MASK.get(''.join(sorted(values[box])))
+        if mask is None:
+            raise ValueError("invalid candidates {!r} for box {}".format(values[box], box))
+        board.append(mask)
+    return board
+
+
+def board2values(board):
+    """Convert a bitmask board to the dictionary board representation
+
+    Parameters
+    ----------
+    board(list)
+        a list of 81 candidate masks in `utils.boxes` order
+
+    Returns
+    -------
+    dict
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    return {box: MASK_DIGITS[mask] for box, mask in zip(boxes, board)}
+
+
+def grid2board(grid):
+    """Convert a grid string into a bitmask board
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    Returns
+    -------
+    list
+        a list of 81 candidate masks in `utils.boxes` order
+    """
+    return values2board(default_topology.grid2values(grid))
+
+
+def eliminate(board):
+    """Apply the eliminate strategy to a bitmask board
+
+    Parameters
+    ----------
+    board(list)
+        a list of 81 candidate masks in `utils.boxes` order
+
+    Returns
+    -------
+    list
+        The board with the assigned values eliminated from peers
+    """
+    solved = [i for i, mask in enumerate(board) if POPCOUNT[mask] == 1]
+    for i in solved:
+        keep = ~board[i]
+        for peer in PEERS[i]:
+            board[peer] &= keep
+    return board
+
+
+def only_choice(board):
+    """Apply the only choice strategy to a bitmask board
+
+    Parameters
+    ----------
+    board(list)
+        a list of 81 candidate masks in `utils.boxes` order
+
+    Returns
+    -------
+    list
+        The board with all single-place digits assigned
+    """
+    for unit in UNITS:
+        once = twice = 0
+        for i in unit:
+            mask = board[i]
+            twice |= once & mask
+            once |= mask
+        singles = once & ~twice
+        if not singles:
+            continue
+        for i in unit:
+            hit = board[i] & singles
+            if hit:
+                # a box that is the only place for several digits keeps the lowest
+                board[i] = hit & -hit
+    return board
+
+
+def naked_twins(board):
+    """Apply the naked twins strategy to a bitmask board
+
+    Parameters
+    ----------
+    board(list)
+        a list of 81 candidate masks in `utils.boxes` order
+
+    Returns
+    -------
+    list
+        The board with the naked twins eliminated from peers
+    """
+    for unit in UNITS:
+        pairs = {}
+        for i in unit:
+            mask = board[i]
+            if POPCOUNT[mask] == 2:
+                pairs.setdefault(mask, []).append(i)
+        twins = [mask for mask, members in pairs.items() if len(members) == 2]
+        if not twins:
+            continue
+        non_twins = [i for i in unit if board[i] not in twins]
+        for pair in twins:
+            for i in non_twins:
+                mask = board[i]
+                if POPCOUNT[mask] > 1:
+                    board[i] = mask & ~pair
+    return board
+
+
+def reduce_puzzle(board):
+    """Reduce a bitmask board by repeatedly applying all constraint strategies
+
+    Parameters
+    ----------
+    board(list)
+        a list of 81 candidate masks in `utils.boxes` order
+
+    Returns
+    -------
+    list or False
+        The board once the strategies no longer change it, or False if the
+        puzzle is unsolvable
+    """
+    while True:
+        before = board[:]
+        eliminate(board)
+        only_choice(board)
+        naked_twins(board)
+        if 0 in board:
+            return False
+        if board == before:
+            return board
+
+
+def search(board):
+    """Apply depth first search with constraint propagation to a bitmask board
+
+    Parameters
+    ----------
+    board(list)
+        a list of 81 candidate masks in `utils.boxes` order
+
+    Returns
+    -------
+    list or False
+        The board with all boxes assigned or False
+    """
+    board = reduce_puzzle(board)
+    if board is False:
+        return False
+    # Choose one of the unfilled boxes with the fewest possibilities
+    best, fewest = None, len(DIGITS) + 1
+    for i, mask in enumerate(board):
+        count = POPCOUNT[mask]
+        if 1 < count < fewest:
+            best, fewest = i, count
+    if best is None:
+        return board  # Solved!
+    remaining = board[best]
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        child = board[:]
+        child[best] = bit
+        attempt = search(child)
+        if attempt:
+            return attempt
+    return False
+
+
+def solve(grid):
+    """Find the solution to a Sudoku puzzle using the bitmask representation
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    board = search(grid2board(grid))
+    if board is False:
+        return False
+    return board2values(board)
@@ -0,0 +1,183 @@
+"""Solution cache keyed by the canonical form of a diagonal Sudoku puzzle.
+
+Two puzzles are isomorphic when one can be turned into the other by a symmetry
+of the board and a relabeling of the digits. The symmetries that keep both
+diagonals as units are the 96 combinations of:
+
+- a line permutation that maps bands to bands and commutes with the reflection
+  i -> 8 - i (permute the rows of the top band and mirror the permutation on
+  the bottom band, optionally swap the outer rows of the middle band, and
+  optionally swap the top and bottom bands), applied to the rows;
+- the same permutation applied to the columns, or the same permutation followed
+  by a reflection, which swaps the two diagonals;
+- an optional transposition.
+
+The canonical form of a grid is the smallest of its 96 images after relabeling
+the digits in order of first appearance. Isomorphic puzzles therefore share one
+cache entry, and a cached solution is mapped back through the inverse transform.
+"""
+import shelve
+from collections import OrderedDict
+from itertools import permutations, product
+
+from utils import values2grid, grid2values
+
+
+LABELS = '123456789'
+
+
+def _line_permutations():
+    """The 24 permutations of 0..8 that preserve bands and commute with i -> 8 - i """
+    perms = []
+    for top, swap_middle, swap_bands in product(permutations(range(3)), (False, True), (False, True)):
+        middle = (5, 4, 3) if swap_middle else (3, 4, 5)
+        sigma = list(top) + list(middle) + [8 - top[2 - i] for i in range(3)]
+        if swap_bands:
+            sigma = [8 - s for s in sigma]
+        perms.append(sigma)
+    return perms
+
+
+def _cell_permutations():
+    """The 96 diagonal-preserving board symmetries as permutations of box positions,
+    where position i of the transformed grid holds position perm[i] of the original
+    """
+    perms = []
+    for sigma, reflect, transpose in product(_line_permutations(), (False, True), (False, True)):
+        tau = [8 - s for s in sigma] if reflect else sigma
+        perm = []
+        for r in range(9):
+            for c in range(9):
+                src_r, src_c = sigma[r], tau[c]
+                if transpose:
+                    src_r, src_c = src_c, src_r
+                perm.append(src_r * 9 + src_c)
+        perms.append(tuple(perm))
+    return perms
+
+
+TRANSFORMS = _cell_permutations()
+
+
+def _relabel(s, order):
+    """Rename the digits of `order` to '1', '2', ... in `s` """
+    return s.translate(str.maketrans(order, LABELS[:len(order)]))
+
+
+def canonical_form(grid):
+    """Find the canonical form of a diagonal Sudoku grid
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    Returns
+    -------
+    tuple
+        (canonical grid, transform, order) where transform is the cell permutation
+        that produced the canonical grid and order is a string of the original
+        digits in the order they were relabeled '1', '2', ...
+    """
+    best = None
+    for perm in TRANSFORMS:
+        image = ''.join(map(grid.__getitem__, perm))
+        order = ''.join(dict.fromkeys(image.replace('.', '')))
+        canon = _relabel(image, order)
+        if best is None or canon < best[0]:
+            best = (canon, perm, order)
+    return best
+
+
+class SolutionCache:
+    """A bounded LRU cache of solutions in front of `solution.solve`, shared by
+    all puzzles with the same canonical form
+
+    Parameters
+    ----------
+    maxsize(int)
+        the number of canonical forms kept in memory
+
+    path(string)
+        if given, entries are also persisted in a `shelve` database at this path
+        and read back from it on a memory miss
+
+    solver(callable)
+        function mapping a grid string to a values dictionary or False
+        (defaults to `solution.solve`)
+    """
+    def __init__(self, maxsize=4096, path=None, solver=None):
+        if solver is None:
+            from solution import solve as solver
+        self.maxsize = maxsize
+        self.solver = solver
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._store = shelve.open(path) if path else None
+
+    def _get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if self._store is not None and key in self._store:
+            entry = self._store[key]
+            self._remember(key, entry)
+            return entry
+        return None
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def solve(self, grid):
+        """Find the solution to a Sudoku puzzle, reusing the solution of any
+        isomorphic puzzle seen before
+
+        Parameters
+        ----------
+        grid(string)
+            a string representing a sudoku grid.
+
+        Returns
+        -------
+        dict or False
+            The dictionary representation of the final sudoku grid or False if no solution exists.
+        """
+        canon, perm, order = canonical_form(grid)
+        entry = self._get(canon)
+        if entry is not None:
+            self.hits += 1
+            if not entry:
+                return False
+            # digits missing from the puzzle are interchangeable in any solution
+            order += ''.join(d for d in LABELS if d not in order)
+            image = entry.translate(str.maketrans(LABELS, order))
+            solved = [None] * len(image)
+            for i, src in enumerate(perm):
+                solved[src] = image[i]
+            return grid2values(''.join(solved))
+
+        self.misses += 1
+        result = self.solver(grid)
+        entry = ''
+        if result:
+            image = ''.join(map(values2grid(result).__getitem__, perm))
+            entry = _relabel(image, ''.join(dict.fromkeys(order + image)))
+        self._remember(canon, entry)
+        if self._store is not None:
+            self._store[canon] = entry
+        return result or False
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
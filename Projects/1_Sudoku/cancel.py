@@ -0,0 +1,105 @@
+"""Cooperative cancellation and time budgets for the search.
+
+`solution.search` and `solution.solve` check a `CancelToken` before every
+branch of the search tree. Once it has been cancelled or its deadline has
+passed, the search stops by raising `Cancelled`, and `solve` returns a
+`PartialResult` with the reduced candidate grid and the stats gathered so far
+instead of a solution:
+
+    result = solve(grid, deadline=time.monotonic() + 0.05)
+    if not result and isinstance(result, PartialResult):
+        ...  # result.values, result.stats, result.reason
+"""
+import threading
+from time import monotonic
+
+
+class Cancelled(Exception):
+    """Raised inside the search when its `CancelToken` has expired """
+
+
+class CancelToken:
+    """A flag for stopping a search from another thread, with an optional deadline
+
+    Parameters
+    ----------
+    deadline(float)
+        a `time.monotonic()` timestamp after which the token counts as expired
+
+    parent(CancelToken)
+        if given, this token also expires with the parent
+
+    event(Event)
+        the flag set by `cancel` (defaults to a new `threading.Event`); pass a
+        `multiprocessing.Event` to cancel searches in other processes
+    """
+    def __init__(self, deadline=None, parent=None, event=None):
+        self.deadline = deadline
+        self.parent = parent
+        self._event = event if event is not None else threading.Event()
+
+    @classmethod
+    def after(cls, seconds, parent=None):
+        """A token whose deadline is `seconds` from now """
+        return cls(monotonic() + seconds, parent)
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """True if `cancel` was called on this token or on one of its parents """
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    @property
+    def reason(self):
+        """'cancelled' or 'deadline' for an expired token, else None """
+        if self.cancelled:
+            return 'cancelled'
+        if self.expired():
+            return 'deadline'
+        return None
+
+    def expired(self):
+        """True once the token has been cancelled or its deadline has passed """
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and monotonic() >= self.deadline:
+            return True
+        return self.parent is not None and self.parent.expired()
+
+    def check(self):
+        """Raise `Cancelled` if the token has expired """
+        if self.expired():
+            raise Cancelled(self.reason)
+
+
+class PartialResult:
+    """What `solve` returns when its search is cancelled
+
+    A partial result is falsy, so callers that only test the result of `solve`
+    treat it as "no solution found".
+
+    Attributes
+    ----------
+    values(dict)
+        the candidate grid after constraint propagation on the givens
+
+    stats(SolveStats)
+        the stats gathered up to the cancellation
+
+    reason(string)
+        'deadline' or 'cancelled'
+    """
+    __slots__ = ('values', 'stats', 'reason')
+
+    def __init__(self, values, stats, reason):
+        self.values = values
+        self.stats = stats
+        self.reason = reason
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'PartialResult(reason={!r})'.format(self.reason)
@@ -0,0 +1,156 @@
+"""Constraint plugins for variant Sudoku.
+
+A plugin adds to a `Topology` any of:
+
+- extra units, for constraints of the form "these N boxes hold every digit
+  once" (e.g. the windoku regions); eliminate, only choice and every strategy
+  that works on units pick them up through `unitlist`
+- extra peers, for constraints of the form "these two boxes differ" (e.g. the
+  anti-knight rule, or the boxes of a killer cage); eliminate picks them up
+  through `peers`
+- strategies, for everything else (e.g. the sums of killer cages); they have the
+  usual `strategy(values, topology)` signature, and the solver schedules them
+  ahead of the other strategies whenever eliminate and only choice stall
+
+Plugins are hashable by their parameters, so that `get_topology` can cache the
+topology of a variant:
+
+    topology = get_topology(3, diagonal=False, constraints=[Windoku(), AntiKnight()])
+    solve(grid, topology=topology)
+"""
+from functools import lru_cache
+from itertools import combinations
+
+
+class Constraint:
+    """Base class for constraint plugins
+
+    `units`, `peers` and `strategies` are called once while the topology is
+    built; only its size, digits, rows, cols and boxes are set at that point.
+    """
+    def units(self, topology):
+        """Extra units, as lists of box names with one box per digit """
+        return []
+
+    def peers(self, topology):
+        """Extra peers, as a dict mapping a box name to the boxes it must differ from """
+        return {}
+
+    def strategies(self, topology):
+        """Propagators with the signature `strategy(values, topology)` """
+        return []
+
+    def _key(self):
+        return ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash((type(self).__name__, self._key()))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(map(repr, self._key())))
+
+
+class Windoku(Constraint):
+    """The windoku (hyper-Sudoku) regions: the squares that sit one box in from
+    the top left corner of each 2 x 2 block of squares, which also hold every
+    digit once
+    """
+    def units(self, topology):
+        n = topology.box_size
+        starts = [1 + k * (n + 1) for k in range(n - 1)]
+        return [[topology.rows[r] + topology.cols[c]
+                 for r in range(top, top + n) for c in range(left, left + n)]
+                for top in starts for left in starts]
+
+
+class AntiKnight(Constraint):
+    """Boxes a chess knight's move apart can not hold the same digit """
+    MOVES = ((1, 2), (2, 1), (-1, 2), (-2, 1), (1, -2), (2, -1), (-1, -2), (-2, -1))
+
+    def peers(self, topology):
+        n = topology.size
+        peers = {}
+        for r in range(n):
+            for c in range(n):
+                peers[topology.rows[r] + topology.cols[c]] = [
+                    topology.rows[r + dr] + topology.cols[c + dc]
+                    for dr, dc in self.MOVES if 0 <= r + dr < n and 0 <= c + dc < n]
+        return peers
+
+
+@lru_cache(maxsize=None)
+def cage_combinations(digits, cells, total):
+    """Every set of `cells` distinct digits that adds up to `total`
+
+    Parameters
+    ----------
+    digits(string)
+        the digit symbols of the board; the value of a digit is its position
+        in `digits` plus one
+
+    cells(int)
+        the number of boxes in the cage
+
+    total(int)
+        the sum of the cage
+
+    Returns
+    -------
+    tuple
+        the combinations as frozensets of digit symbols
+    """
+    return tuple(frozenset(digits[v - 1] for v in combo)
+                 for combo in combinations(range(1, len(digits) + 1), cells)
+                 if sum(combo) == total)
+
+
+class KillerCages(Constraint):
+    """Killer cages: the digits of each cage are distinct and add up to its sum
+
+    Parameters
+    ----------
+    cages(iterable)
+        (sum, boxes) pairs, where boxes is a list of box names
+    """
+    def __init__(self, cages):
+        self.cages = tuple((total, tuple(boxes)) for total, boxes in cages)
+        for total, boxes in self.cages:
+            if len(set(boxes)) != len(boxes):
+                raise ValueError("cage {!r} repeats a box".format(boxes))
+
+    def _key(self):
+        return (self.cages,)
+
+    def peers(self, topology):
+        peers = {}
+        for total, boxes in self.cages:
+            for box in boxes:
+                peers.setdefault(box, []).extend(boxes)
+        return peers
+
+    def strategies(self, topology):
+        for total, boxes in self.cages:
+            cage_combinations(topology.digits, len(boxes), total)     # warm up the table
+        return [self.killer_cages]
+
+    def killer_cages(self, values, topology):
+        """Eliminate values using the sums of the killer cages
+
+        A digit stays a candidate for a box of a cage only if it belongs to a
+        combination with the cage's sum that every box of the cage can still
+        take part in. A cage with no such combination empties its boxes.
+        """
+        for total, boxes in self.cages:
+            cands = [values[box] for box in boxes]
+            present = set(''.join(cands))
+            allowed = set()
+            for combo in cage_combinations(topology.digits, len(boxes), total):
+                if combo <= present and all(not combo.isdisjoint(c) for c in cands):
+                    allowed |= combo
+            for box, cand in zip(boxes, cands):
+                if not allowed.issuperset(cand):
+                    values[box] = ''.join(d for d in cand if d in allowed)
+        return values
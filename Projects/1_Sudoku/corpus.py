@@ -0,0 +1,119 @@
+"""Stream puzzle corpora stored as one 81-character grid record per line.
+
+Records are read through a memory map and written one line at a time, so a
+corpus of any size can be solved in constant memory::
+
+    with GridWriter('solved.txt') as out:
+        for grid in iter_grids('puzzles.txt'):
+            out.write(solve(grid) or grid)
+"""
+import mmap
+
+from utils import boxes, grid2values, values2grid
+
+
+def iter_grids(path):
+    """Lazily read the grid strings in a corpus file
+
+    Parameters
+    ----------
+    path(string)
+        path to a file with one grid string per line (blank lines are skipped)
+
+    Yields
+    ------
+    string
+        a string representing a sudoku grid
+    """
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            return
+        with mm:
+            for lineno, line in enumerate(iter(mm.readline, b''), 1):
+                record = line.strip()
+                if not record:
+                    continue
+                if len(record) != len(boxes):
+                    raise ValueError("{}:{}: expected a {}-character grid, got {} characters".format(
+                        path, lineno, len(boxes), len(record)))
+                yield record.decode('ascii')
+
+
+def iter_puzzles(path):
+    """Lazily read the puzzles in a corpus file in dictionary form
+
+    Parameters
+    ----------
+    path(string)
+        path to a file with one grid string per line
+
+    Yields
+    ------
+    dict
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    for grid in iter_grids(path):
+        yield grid2values(grid)
+
+
+class GridWriter:
+    """Append grids to a corpus file in the format read by `iter_grids`
+
+    Parameters
+    ----------
+    path(string)
+        path to the output file; it is created if needed and appended to otherwise
+    """
+    def __init__(self, path):
+        self._file = open(path, 'a', encoding='ascii')
+
+    def write(self, values):
+        """Append one record, given either as a grid string or a values dictionary """
+        grid = values if isinstance(values, str) else values2grid(values)
+        if len(grid) != len(boxes):
+            raise ValueError("expected a {}-character grid, got {} characters".format(len(boxes), len(grid)))
+        self._file.write(grid + '\n')
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def solve_corpus(src, dst, solver=None):
+    """Solve every puzzle in a corpus file and append the solutions to another
+
+    Parameters
+    ----------
+    src(string)
+        path to the corpus of puzzles
+
+    dst(string)
+        path of the output corpus, which is appended to; one line is written
+        per puzzle, in input order, and puzzles with no solution are written
+        unchanged, so the Nth line written corresponds to the Nth puzzle (blank
+        lines of `src` are skipped, and lines already in `dst` are kept)
+
+    solver(callable)
+        function mapping a grid string to a values dictionary or False
+        (defaults to `solution.solve`)
+
+    Returns
+    -------
+    int
+        the number of puzzles processed
+    """
+    if solver is None:
+        from solution import solve as solver
+    count = 0
+    with GridWriter(dst) as out:
+        for grid in iter_grids(src):
+            out.write(solver(grid) or grid)
+            count += 1
+    return count
@@ -0,0 +1,197 @@
+"""Exact cover (Algorithm X with dancing links) backend for the Sudoku solver.
+
+Each (box, digit) placement is a row of the exact cover matrix. It covers one
+column for the box and one column for every (unit, digit) pair of the units
+that contain the box. A solution is a set of rows that covers every column
+exactly once. The search always branches on the column with the fewest rows
+left (Knuth's S heuristic).
+"""
+from functools import lru_cache
+
+from solution import default_topology
+
+
+@lru_cache()
+def _template(topology):
+    """Build the dancing links for the empty board of a topology
+
+    Returns
+    -------
+    tuple
+        (left, right, up, down, column, size, row_of, first_node) where the first
+        six are the link arrays (node 0 is the root and nodes 1..n the column
+        headers), row_of maps a node to its (box, digit) placement and first_node
+        maps a placement to one node in its row
+    """
+    if any(c.peers(topology) or c.strategies(topology) for c in topology.constraints):
+        raise ValueError("Dancing links only supports constraint plugins that add units")
+    n_digits = len(topology.digits)
+    n_cols = len(topology.boxes) + len(topology.unitlist) * n_digits
+    left = [n_cols] + list(range(n_cols))
+    right = list(range(1, n_cols + 1)) + [0]
+    up = list(range(n_cols + 1))
+    down = list(range(n_cols + 1))
+    column = list(range(n_cols + 1))
+    size = [0] * (n_cols + 1)
+    row_of = [None] * (n_cols + 1)
+    first_node = {}
+
+    unit_offset = len(topology.boxes) + 1
+    for b, box in enumerate(topology.boxes):
+        for d, digit in enumerate(topology.digits):
+            cols = [b + 1] + [unit_offset + u * n_digits + d for u in topology.unit_ids[box]]
+            start = len(column)
+            for k, c in enumerate(cols):
+                node = start + k
+                left.append(start + (k - 1) % len(cols))
+                right.append(start + (k + 1) % len(cols))
+                # insert at the bottom of column c
+                up.append(up[c])
+                down.append(c)
+                down[up[c]] = node
+                up[c] = node
+                column.append(c)
+                size[c] += 1
+                row_of.append((box, digit))
+            first_node[(box, digit)] = start
+    return left, right, up, down, column, size, row_of, first_node
+
+
+def iter_solutions(grid, topology=None):
+    """Enumerate the solutions of a Sudoku puzzle with Algorithm X
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    Yields
+    ------
+    dict
+        The dictionary representation of each solved sudoku grid
+    """
+    topology = topology or default_topology
+    topology.check_grid(grid)
+    template = _template(topology)
+    L, R, U, D, C, S = (list(links) for links in template[:6])
+    row_of, first_node = template[6], template[7]
+
+    def cover(c):
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(c):
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def cover_row(r):
+        j = R[r]
+        while j != r:
+            cover(C[j])
+            j = R[j]
+
+    def uncover_row(r):
+        j = L[r]
+        while j != r:
+            uncover(C[j])
+            j = L[j]
+
+    # the givens are selected up front; two givens sharing a column contradict each other
+    givens = {}
+    covered = set()
+    for box, value in zip(topology.boxes, grid):
+        if value == '.':
+            continue
+        if (box, value) not in first_node:
+            return
+        r = first_node[(box, value)]
+        j = r
+        while True:
+            if C[j] in covered:
+                return
+            covered.add(C[j])
+            cover(C[j])
+            j = R[j]
+            if j == r:
+                break
+        givens[box] = value
+
+    # explicit stack of [column, chosen row node] frames
+    stack = []
+    while True:
+        if R[0] == 0:
+            values = dict(givens)
+            values.update(row_of[r] for c, r in stack)
+            yield values
+            descend = False
+        else:
+            # branch on the column with the fewest remaining rows
+            c, j = R[0], R[R[0]]
+            while j != 0:
+                if S[j] < S[c]:
+                    c = j
+                j = R[j]
+            cover(c)
+            stack.append([c, D[c]])
+            descend = D[c] != c
+            if descend:
+                cover_row(D[c])
+        while not descend:
+            if not stack:
+                return
+            frame = stack[-1]
+            c, r = frame
+            if r != c:
+                uncover_row(r)
+                r = D[r]
+                frame[1] = r
+            if r != c:
+                cover_row(r)
+                descend = True
+            else:
+                uncover(c)
+                stack.pop()
+
+
+def solve(grid, topology=None):
+    """Find the solution to a Sudoku puzzle with Algorithm X
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    return next(iter_solutions(grid, topology), False)
@@ -0,0 +1,233 @@
+"""Generate diagonal Sudoku puzzles with a unique solution.
+
+A puzzle is dug out of a random full grid one clue at a time. The current
+puzzle always has a unique solution, namely the full grid, so removing the clue
+`d` from a box keeps it unique exactly when no solution puts anything other
+than `d` in that box. Each removal therefore needs a single search for *one*
+solution of the puzzle with `d` struck from the box, instead of counting the
+solutions of the new puzzle from scratch. The clues that have not been tried
+yet are propagated once, up front, on a board with an undo trail, so each
+removal only propagates the clues found to be needed and the struck digit.
+
+Puzzles are rated by the strategies they need:
+
+- 'easy': eliminate, only choice and naked twins solve it
+- 'medium': the strategies in strategies.py are needed, but no search
+- 'hard': search is needed
+
+and `generate` spreads the work over a pool of worker processes.
+"""
+import random
+from functools import partial
+from multiprocessing import Pool
+
+import strategies
+from batch import _init_worker
+from scheduler import StrategyScheduler
+from solution import default_topology, _propagate, _scheduler, _search_in_place, _undo, reduce_puzzle
+
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def full_grid(rng=None, topology=None, seeds=11):
+    """A random solved grid
+
+    Parameters
+    ----------
+    rng(random.Random)
+        the source of randomness (defaults to a new unseeded one)
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    seeds(int)
+        number of random digits placed, with propagation, before searching for
+        a solution that completes them
+
+    Returns
+    -------
+    string
+        the solved grid
+    """
+    rng = rng or random.Random()
+    topology = topology or default_topology
+    scheduler = _scheduler((), topology)
+    while True:
+        values = topology.grid2values('.' * len(topology.boxes))
+        trail = []
+        for box in rng.sample(topology.boxes, seeds):
+            if len(values[box]) == 1:
+                continue
+            trail.append((box, values[box]))
+            values[box] = rng.choice(values[box])
+            if _propagate(values, [box], topology, trail, scheduler) is False:
+                break
+        else:
+            solved = _search_in_place(values, topology, scheduler)
+            if solved and topology.strategies:
+                # relabeling could break constraints on digit values, like cage sums
+                return topology.values2grid(solved)
+            if solved:
+                # relabel the digits, since search tries them in order
+                labels = ''.join(rng.sample(topology.digits, len(topology.digits)))
+                return topology.values2grid(solved).translate(str.maketrans(topology.digits, labels))
+        _undo(values, trail, 0)
+
+
+def rate(grid, topology=None):
+    """Rate the difficulty of a puzzle with a unique solution
+
+    Returns
+    -------
+    string
+        'easy', 'medium' or 'hard' (see the module docstring)
+    """
+    topology = topology or default_topology
+    for difficulty, extra in (('easy', ()), ('medium', strategies.ALL)):
+        values = reduce_puzzle(topology.grid2values(grid), topology, extra)
+        if values and all(len(v) == 1 for v in values.values()):
+            return difficulty
+    return 'hard'
+
+
+def dig(solved, clues, rng=None, topology=None):
+    """Remove clues from a solved grid, in random order, while the solution
+    stays unique
+
+    Parameters
+    ----------
+    solved(string)
+        a solved grid
+
+    clues(int)
+        stop once the puzzle is down to this many clues
+
+    Returns
+    -------
+    string
+        the puzzle; it has more than `clues` clues if every remaining clue is
+        needed for uniqueness
+    """
+    rng = rng or random.Random()
+    topology = topology or default_topology
+    scheduler = _scheduler((), topology)
+    order = rng.sample(range(len(solved)), len(solved))
+    # the clues not yet tried are always still in the puzzle, so place them in
+    # reverse digging order on one board, propagated by eliminate and only choice:
+    # rolling the trail back to marks[i] leaves the clues of order[i + 1:]
+    cheap = StrategyScheduler([])
+    values = topology.grid2values('.' * len(solved))
+    trail = []
+    marks = [0] * len(order)
+    for i in reversed(range(len(order))):
+        marks[i] = len(trail)
+        box = topology.boxes[order[i]]
+        trail.append((box, values[box]))
+        values[box] = solved[order[i]]
+        _propagate(values, [box], topology, trail, cheap)
+    puzzle = list(solved)
+    kept = []       # the boxes of the clues already tried that uniqueness needs
+    remaining = len(puzzle)
+    for i, pos in enumerate(order):
+        if remaining <= clues:
+            break
+        _undo(values, trail, marks[i])
+        box, digit = topology.boxes[pos], solved[pos]
+        for clue in kept:
+            trail.append((clue, values[clue]))
+            values[clue] = solved[topology.index[clue]]
+        trail.append((box, values[box]))
+        values[box] = values[box].replace(digit, '')
+        if (_propagate(values, kept + [box], topology, trail, scheduler) is False
+                or _search_in_place(dict(values), topology, scheduler) is False):
+            puzzle[pos] = '.'
+            remaining -= 1      # the full grid is still the only solution
+        else:
+            kept.append(box)
+    return ''.join(puzzle)
+
+
+def make_puzzle(clues=28, difficulty=None, seed=None, topology=None, attempts=20):
+    """Generate a puzzle with a unique solution
+
+    Parameters
+    ----------
+    clues(int)
+        the number of clues of the puzzle
+
+    difficulty(string)
+        if given, the rating ('easy', 'medium' or 'hard') the puzzle must have
+
+    seed(int)
+        seed for the random number generator, for reproducible puzzles
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    attempts(int)
+        number of full grids to try before giving up
+
+    Returns
+    -------
+    string or None
+        the puzzle, or None if no full grid in `attempts` yielded a puzzle with
+        `clues` clues and the requested difficulty
+    """
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError("Unknown difficulty: {!r}".format(difficulty))
+    rng = random.Random(seed)
+    topology = topology or default_topology
+    for _ in range(attempts):
+        puzzle = dig(full_grid(rng, topology), clues, rng, topology)
+        if len(puzzle) - puzzle.count('.') != clues:
+            continue
+        if difficulty is None or rate(puzzle, topology) == difficulty:
+            return puzzle
+    return None
+
+
+def generate(count, clues=28, difficulty=None, workers=None, seed=0, topology=None):
+    """Generate many puzzles with a unique solution in a pool of worker processes
+
+    Parameters
+    ----------
+    count(int)
+        the number of puzzles
+
+    clues, difficulty, topology
+        as in `make_puzzle`
+
+    workers(int)
+        number of worker processes (defaults to the number of CPUs); with a
+        single worker the puzzles are generated in the calling process
+
+    seed(int)
+        base seed; the same seed and arguments always give the same puzzles
+
+    Returns
+    -------
+    list
+        the puzzles as grid strings
+    """
+    make = partial(make_puzzle, clues, difficulty, topology=topology)
+    puzzles = []
+    next_seed = seed * 1000003
+    pool = Pool(workers, initializer=_init_worker) if workers != 1 else None
+    try:
+        while len(puzzles) < count:
+            seeds = range(next_seed, next_seed + count - len(puzzles))
+            next_seed += len(seeds)
+            found = [p for p in (pool.imap(make, seeds) if pool else map(make, seeds)) if p]
+            if not found:
+                raise ValueError("Could not generate puzzles with {} clues and difficulty {!r}"
+                                 .format(clues, difficulty))
+            puzzles.extend(found)
+    finally:
+        if pool is not None:
+            # every batch has been collected, so the workers are idle and exit
+            # on close; terminate() would hang on workers that inherited a
+            # SIGTERM handler (e.g. from SDL)
+            pool.close()
+            pool.join()
+    return puzzles[:count]
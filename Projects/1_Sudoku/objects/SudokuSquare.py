@@ -41,20 +41,24 @@ def AAfilledRoundedRect(surface,rect,color,radius=0.4):
 
     return surface.blit(rectangle,pos)
 
+_fonts = {}
+
+
+def get_font(name='opensans', size=21):
+    """Look up a system font once and share it between all squares """
+    if (name, size) not in _fonts:
+        _fonts[name, size] = pygame.font.SysFont(name, size)
+    return _fonts[name, size]
+
+
 class SudokuSquare:
     """A sudoku square class."""
     def __init__(self, number=None, offsetX=0, offsetY=0, edit="Y", xLoc=0, yLoc=0):
-        if number != None:
-            number = str(number)
-            self.color = (2, 204, 186)
-        else:
-            number = ""
-            self.color = (255, 255, 255)
         # print("FONTS", pygame.font.get_fonts())
-        self.font = pygame.font.SysFont('opensans', 21)
-        self.text = self.font.render(number, 1, (255, 255, 255))
-        self.textpos = self.text.get_rect()
-        self.textpos = self.textpos.move(offsetX + 17, offsetY + 4)
+        self.font = get_font()
+        self.offsetX = offsetX
+        self.offsetY = offsetY
+        self.set(number)
 
         # self.collide = pygame.Surface((25, 22))
         # self.collide = self.collide.convert()
@@ -67,15 +71,26 @@ class SudokuSquare:
         self.edit = edit
         self.xLoc = xLoc
         self.yLoc = yLoc
-        self.offsetX = offsetX
-        self.offsetY = offsetY
+
+    def set(self, number):
+        """Show `number` (None for an empty square) on the next `draw` """
+        if number != None:
+            number = str(number)
+            self.color = (2, 204, 186)
+        else:
+            number = ""
+            self.color = (255, 255, 255)
+        self.text = self.font.render(number, 1, (255, 255, 255))
+        self.textpos = self.text.get_rect()
+        self.textpos = self.textpos.move(self.offsetX + 17, self.offsetY + 4)
 
     def draw(self):
         screen = pygame.display.get_surface()
-        AAfilledRoundedRect(screen, (self.offsetX, self.offsetY, 45, 40), self.color)
+        rect = AAfilledRoundedRect(screen, (self.offsetX, self.offsetY, 45, 40), self.color)
 
         # screen.blit(self.collide, self.collideRect)
         screen.blit(self.text, self.textpos)
+        return rect
 
 
     def checkCollide(self, collision):
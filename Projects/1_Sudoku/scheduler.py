@@ -0,0 +1,127 @@
+"""Cost-aware scheduling of the propagation strategies used by `reduce_puzzle`.
+
+Eliminate and only choice are cheap and run incrementally from the propagation
+queue in solution.py. Every other strategy is expensive, so a `StrategyScheduler`
+only escalates to it once the cheap ones have stalled. Strategies are tried in
+order, and the scheduler drops back to the cheap strategies as soon as one of
+them makes progress. It also keeps call, yield and timing statistics for each
+strategy, so that the order and the cut-offs can be tuned from real runs.
+"""
+from time import perf_counter
+
+
+class StrategyStats:
+    """Running totals for one strategy """
+    __slots__ = ('calls', 'hits', 'removed', 'seconds')
+
+    def __init__(self):
+        self.calls = 0          # times the strategy ran
+        self.hits = 0           # runs that removed at least one candidate
+        self.removed = 0        # candidates removed over all runs
+        self.seconds = 0.0      # time spent in the strategy
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'hits': self.hits,
+            'removed': self.removed,
+            'seconds': self.seconds,
+            'hit_rate': self.hits / self.calls if self.calls else 0.0,
+        }
+
+
+class StrategyScheduler:
+    """Escalate through expensive strategies only while the cheap ones are stalled
+
+    Parameters
+    ----------
+    strategies(list)
+        strategy functions with the signature `strategy(values, topology)`, from
+        the cheapest (tried first) to the most expensive
+
+    cutoffs(dict)
+        maps a strategy name to the number of consecutive fruitless runs after
+        which it is skipped for the rest of a reduction. Strategies without a
+        cut-off always run, which keeps the fixpoint of `reduce_puzzle` exact.
+
+    Attributes
+    ----------
+    stats(dict)
+        a `StrategyStats` per strategy name, accumulated over every reduction
+        that used this scheduler
+    """
+    def __init__(self, strategies, cutoffs=None):
+        self.strategies = list(strategies)
+        self.cutoffs = dict(cutoffs or {})
+        self.stats = {strategy.__name__: StrategyStats() for strategy in self.strategies}
+
+    def escalate(self, values, topology, fruitless):
+        """Run the strategies in order until one of them changes `values`
+
+        Parameters
+        ----------
+        values(dict)
+            a dictionary of the form {'box_name': '123456789', ...}
+
+        topology(Topology)
+            the board shape
+
+        fruitless(dict)
+            consecutive fruitless runs per strategy name in the current reduction;
+            updated in place
+
+        Returns
+        -------
+        dict
+            the previous value of every box that changed, or an empty dict if
+            every strategy stalled
+        """
+        for strategy in self.strategies:
+            name = strategy.__name__
+            cutoff = self.cutoffs.get(name)
+            if cutoff is not None and fruitless.get(name, 0) >= cutoff:
+                continue
+            stats = self.stats[name]
+            before = dict(values)
+            start = perf_counter()
+            strategy(values, topology)
+            stats.seconds += perf_counter() - start
+            stats.calls += 1
+            changed = {box: old for box, old in before.items() if values[box] != old}
+            if changed:
+                stats.hits += 1
+                stats.removed += sum(len(old) - len(values[box]) for box, old in changed.items())
+                fruitless[name] = 0
+                return changed
+            fruitless[name] = fruitless.get(name, 0) + 1
+        return {}
+
+    def requiring(self, strategies):
+        """This schedule with `strategies` run first and never cut off
+
+        Parameters
+        ----------
+        strategies(list)
+            strategy functions that every reduction has to run to stay sound,
+            such as the propagators of a topology's constraint plugins
+
+        Returns
+        -------
+        StrategyScheduler
+            this scheduler if it already runs `strategies` first without a cut-off,
+            otherwise a new one that shares its statistics
+        """
+        names = {strategy.__name__ for strategy in strategies}
+        if self.strategies[:len(strategies)] == list(strategies) and not names & set(self.cutoffs):
+            return self
+        scheduler = StrategyScheduler(
+            list(strategies) + [s for s in self.strategies if s.__name__ not in names],
+            {name: cutoff for name, cutoff in self.cutoffs.items() if name not in names})
+        for strategy in strategies:
+            self.stats.setdefault(strategy.__name__, StrategyStats())
+        scheduler.stats = self.stats
+        return scheduler
+
+    def report(self):
+        """The statistics of every strategy as plain dictionaries, in schedule order """
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
@@ -0,0 +1,306 @@
+"""A local asyncio service around `solution.solve`.
+
+The service keeps a pool of warmed-up worker processes, so that consumers do
+not pay for importing and warming up the solver on every run. Requests arriving
+within `max_delay` seconds of each other are micro-batched into one job for the
+pool, up to `max_batch` grids per job.
+
+Two protocols share one TCP port (or unix socket):
+
+- line protocol: every line is a grid, or a JSON object {"grid": ..., "id": ...},
+  and is answered by one JSON line, in order; clients may pipeline requests
+- HTTP/1.1: `POST /solve` with a grid or the same JSON object as the body, and
+  `GET /metrics`
+
+A response looks like
+
+    {"id": 7, "solution": "2674...", "error": null, "batch_size": 3,
+     "queue_ms": 1.9, "solve_ms": 3.2, "latency_ms": 5.4}
+
+where solution is null if the puzzle has no solution, queue_ms is the time
+spent waiting for the batch to be dispatched, solve_ms the time the worker spent
+on this grid, and latency_ms the total time the service held the request.
+
+Run it with `python server.py --port 8765`.
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from batch import _init_worker
+from solution import default_topology, solve
+from stats import percentile
+
+
+WARM_UP_GRID = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+LINE_LIMIT = 2 ** 16        # longest request line or HTTP header, in bytes
+
+
+def _warm_up():
+    solve(WARM_UP_GRID)
+
+
+def _solve_batch(grids):
+    """Solve a batch of grids in a worker, returning (solution, error, seconds) triples """
+    results = []
+    for grid in grids:
+        start = perf_counter()
+        try:
+            values = solve(grid)
+            solved, error = (default_topology.values2grid(values) if values else None), None
+        except ValueError as exc:
+            solved, error = None, str(exc)
+        results.append((solved, error, perf_counter() - start))
+    return results
+
+
+class SolverService:
+    """Micro-batching front end to a process pool of solvers
+
+    Parameters
+    ----------
+    workers(int)
+        number of worker processes (defaults to the number of CPUs)
+
+    max_batch(int)
+        the largest number of grids sent to a worker in one job
+
+    max_delay(float)
+        how long, in seconds, a batch waits for more requests after its first
+
+    window(int)
+        how many of the most recent request latencies the percentiles of
+        `metrics` are taken over
+    """
+    def __init__(self, workers=None, max_batch=32, max_delay=0.002, window=10000):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.latencies = deque(maxlen=window)
+        self.requests = self.batches = 0
+        self._executor = None
+        self._queue = None
+        self._batcher = None
+        self._running = set()
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """Start the worker pool and listen on a TCP port or, if `path` is given,
+        a unix socket
+
+        Returns
+        -------
+        tuple or string
+            the (host, port) or path the service listens on
+        """
+        workers = self.workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(workers, initializer=_init_worker)
+        # start and warm up every worker before accepting connections, so that
+        # no worker is forked while holding a copy of a client's socket
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self._executor, _warm_up)
+                               for _ in range(workers)])
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.ensure_future(self._collect())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path, limit=LINE_LIMIT)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=LINE_LIMIT)
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def submit(self, grid, request_id=None):
+        """Solve one grid through the batching queue and return the response dict """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((grid, perf_counter(), future))
+        response = await future
+        response['id'] = request_id
+        return response
+
+    def metrics(self):
+        """Request counts, mean batch size and the latency percentiles of the most
+        recent requests in milliseconds
+        """
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch': self.requests / self.batches if self.batches else 0.0,
+            'p50_ms': 1000 * percentile(self.latencies, 50),
+            'p95_ms': 1000 * percentile(self.latencies, 95),
+            'p99_ms': 1000 * percentile(self.latencies, 99),
+        }
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            closes = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = closes - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _dispatch(self, batch):
+        dispatched = perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _solve_batch, [grid for grid, _, _ in batch])
+        except Exception as exc:
+            results = [(None, 'solver failed: {}'.format(exc), 0.0)] * len(batch)
+        done = perf_counter()
+        self.batches += 1
+        for (grid, arrived, future), (solved, error, seconds) in zip(batch, results):
+            self.requests += 1
+            self.latencies.append(done - arrived)
+            if not future.done():
+                future.set_result({
+                    'solution': solved,
+                    'error': error,
+                    'batch_size': len(batch),
+                    'queue_ms': 1000 * (dispatched - arrived),
+                    'solve_ms': 1000 * seconds,
+                    'latency_ms': 1000 * (done - arrived),
+                })
+
+    def _parse(self, payload):
+        """(grid, id) from a request body, or raise ValueError """
+        payload = payload.strip()
+        if payload.startswith('{'):
+            request = json.loads(payload)
+            if not isinstance(request, dict) or not isinstance(request.get('grid'), str):
+                raise ValueError('expected an object with a "grid" string')
+            return request['grid'], request.get('id')
+        return payload, None
+
+    async def _respond(self, payload):
+        try:
+            grid, request_id = self._parse(payload)
+        except ValueError as exc:
+            return {'id': None, 'solution': None, 'error': str(exc)}
+        return await self.submit(grid, request_id)
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                first = await reader.readline()
+            except ValueError:
+                first = None
+            if first is not None and first.startswith((b'POST ', b'GET ')):
+                await self._handle_http(first, reader, writer)
+                return
+            # line protocol: requests run concurrently, so that pipelined lines can
+            # share a batch, and a writer answers them in order
+            responses = asyncio.Queue()
+            sender = asyncio.ensure_future(self._send(responses, writer))
+            line = first
+            while line:
+                if line.strip():
+                    await responses.put(asyncio.ensure_future(self._respond(line.decode('ascii', 'replace'))))
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    line = None
+            if line is None:
+                # a line overran LINE_LIMIT, so the rest of the stream cannot be
+                # split into requests; answer it with an error and hang up
+                await responses.put(self._rejected('request line longer than {} bytes'.format(LINE_LIMIT)))
+            await responses.put(None)
+            await sender
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _rejected(self, error):
+        """A finished response future carrying `error` """
+        future = asyncio.get_running_loop().create_future()
+        future.set_result({'id': None, 'solution': None, 'error': error})
+        return future
+
+    async def _send(self, responses, writer):
+        while True:
+            task = await responses.get()
+            if task is None:
+                return
+            writer.write(json.dumps(await task).encode() + b'\n')
+            await writer.drain()
+
+    async def _handle_http(self, first, reader, writer):
+        try:
+            method, target = first.decode('latin-1').split()[:2]
+            length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = header.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            body = (await reader.readexactly(length)).decode('ascii', 'replace') if length else ''
+        except (ValueError, asyncio.IncompleteReadError) as exc:
+            await self._write_http(writer, '400 Bad Request', {'error': 'bad request: {}'.format(exc)})
+            return
+        if method == 'POST' and target == '/solve':
+            status, response = '200 OK', await self._respond(body)
+        elif method == 'GET' and target == '/metrics':
+            status, response = '200 OK', self.metrics()
+        else:
+            status, response = '404 Not Found', {'error': 'unknown endpoint'}
+        await self._write_http(writer, status, response)
+
+    async def _write_http(self, writer, status, response):
+        content = json.dumps(response).encode()
+        writer.write('HTTP/1.1 {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                     'Connection: close\r\n\r\n'.format(status, len(content)).encode('latin-1') + content)
+        await writer.drain()
+
+
+async def serve(host, port, path=None, **options):
+    service = SolverService(**options)
+    address = await service.start(host, port, path)
+    print('Solving on {}'.format(address))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve solution.solve over a local socket')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a unix socket instead')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--max-delay', type=float, default=0.002)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, workers=args.workers,
+                          max_batch=args.max_batch, max_delay=args.max_delay))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
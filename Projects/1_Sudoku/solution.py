@@ -1,25 +1,29 @@
+from collections import Counter, deque
+from time import perf_counter
 
 from utils import *
+from topology import get_topology
+from scheduler import StrategyScheduler
+from stats import SolveStats
+from cancel import CancelToken, Cancelled, PartialResult
 
 
-row_units = [cross(r, cols) for r in rows]
-column_units = [cross(rows, c) for c in cols]
-square_units = [cross(rs, cs) for rs in ('ABC','DEF','GHI') for cs in ('123','456','789')]
-unitlist = row_units + column_units + square_units
-diagonal_1 = [[r+c for r,c in zip(rows, cols)]]
-#print(diagonal_1)
-diagonal_2 = [[r+c for r,c in zip(rows, cols[::-1])]]
-#print(diagonal_2)
-# TODO: Update the unit list to add the new diagonal units
-unitlist = unitlist + diagonal_1 + diagonal_2
-#print(unitlist)
+# The diagonal 9x9 board. The strategies below take an optional `topology` to run
+# on any other board shape instead (see topology.py).
+default_topology = get_topology(box_size=3, diagonal=True)
 
+row_units = default_topology.row_units
+column_units = default_topology.column_units
+square_units = default_topology.square_units
+diagonal_units = default_topology.diagonal_units
+unitlist = default_topology.unitlist
 
-# Must be called after all units (including diagonals) are added to the unitlist
-units = extract_units(unitlist, boxes)
-peers = extract_peers(units, boxes)
+units = default_topology.units
+peers = default_topology.peers
+# indexes into unitlist of the units each box belongs to, for the propagation queue
+unit_ids = default_topology.unit_ids
 
-def naked_twins(values):
+def naked_twins(values, topology=None):
     """Eliminate values using the naked twins strategy.
 
     The naked twins strategy says that if you have two or more unallocated boxes
@@ -32,6 +36,9 @@ def naked_twins(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
     Returns
     -------
     dict
@@ -55,21 +62,30 @@ def naked_twins(values):
     # TODO: Implement this function!
     #raise NotImplementedError
 
-    for unit in unitlist:
-        vals = [values[b] for b in unit]
-        duplicates_val =[vals.count(s) for s in vals] # couting total duplicates
-        naked_twins = [unit[i] for i in range(0,9) if duplicates_val[i]==2 and len(vals[i])==2] # calculating all naked_twins
-        non_twins = set(unit) - set(naked_twins) # obtaining all non-twins
-        
-        for box in naked_twins:
-            for digit in values[box]:
-                for non_twin in non_twins:
-                    if len(values[non_twin]) > 1:
-                        values[non_twin] = values[non_twin].replace(digit, '') # removing those digits from the non-twins
-        
+    for unit in (topology or default_topology).unitlist:
+        _naked_twins_unit(values, unit)
     return values
-  
-def eliminate(values):
+
+
+def _naked_twins_unit(values, unit):
+    """Apply the naked twins strategy to a single unit and return the changed boxes """
+    pairs = Counter(values[box] for box in unit if len(values[box]) == 2) # counting duplicate pairs in one pass
+    twins = [pair for pair, count in pairs.items() if count == 2] # digits of all naked twins
+    if not twins:
+        return []
+    non_twins = [box for box in unit if values[box] not in twins] # obtaining all non-twins
+
+    changed = []
+    for pair in twins:
+        for digit in pair:
+            for non_twin in non_twins:
+                if len(values[non_twin]) > 1 and digit in values[non_twin]:
+                    values[non_twin] = values[non_twin].replace(digit, '') # removing those digits from the non-twins
+                    changed.append(non_twin)
+    return changed
+
+
+def eliminate(values, topology=None):
     """Apply the eliminate strategy to a Sudoku puzzle
 
     The eliminate strategy says that if a box has a value assigned, then none
@@ -80,6 +96,9 @@ def eliminate(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
     Returns
     -------
     dict
@@ -87,15 +106,16 @@ def eliminate(values):
     """
     # TODO: Copy your code from the classroom to complete this function
     #raise NotImplementedError
+    topology = topology or default_topology
     solved_values = [box for box in values.keys() if len(values[box]) == 1]
     for box in solved_values:
         digit = values[box]
-        for peer in peers[box]:
+        for peer in topology.peers[box]:
             values[peer] = values[peer].replace(digit,'')
     return values
     #elif len(values[s]) == 2 # Peter Norvig's Site
 
-def only_choice(values):
+def only_choice(values, topology=None):
     """Apply the only choice strategy to a Sudoku puzzle
 
     The only choice strategy says that if only one box in a unit allows a certain
@@ -106,6 +126,9 @@ def only_choice(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
     Returns
     -------
     dict
@@ -117,15 +140,139 @@ def only_choice(values):
     """
     # TODO: Copy your code from the classroom to complete this function
     #raise NotImplementedError
-    for unit in unitlist:
-        for digit in '123456789':
-            dplaces = [box for box in unit if digit in values[box]]
-            if len(dplaces) == 1:
-                values[dplaces[0]] = digit
+    topology = topology or default_topology
+    for unit in topology.unitlist:
+        _only_choice_unit(values, unit, topology.digits)
     return values
 
 
-def reduce_puzzle(values):
+def _only_choice_unit(values, unit, digits):
+    """Apply the only choice strategy to a single unit and return the changed boxes """
+    changed = []
+    for digit in digits:
+        dplaces = [box for box in unit if digit in values[box]]
+        if len(dplaces) == 1 and values[dplaces[0]] != digit:
+            values[dplaces[0]] = digit
+            changed.append(dplaces[0])
+    return changed
+
+
+def _scheduler(strategies, topology):
+    """The StrategyScheduler for a `strategies` argument: a list of extra strategies
+    is scheduled after the propagators of the topology's constraint plugins and
+    naked twins, and a scheduler is used as given except that those propagators
+    always run first and are never cut off, since the rules depend on them
+    """
+    if isinstance(strategies, StrategyScheduler):
+        return strategies.requiring(topology.strategies)
+    return StrategyScheduler(topology.strategies + [naked_twins] + list(strategies))
+
+
+def _propagate(values, dirty, topology, trail=None, scheduler=None, stats=None):
+    """Run eliminate and only choice to a fixpoint, revisiting only the peers and
+    units of boxes that changed (in the style of AC-3), and escalate to the
+    scheduled strategies whenever they stall
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    dirty(iterable)
+        the boxes whose values changed since `values` was last at a fixpoint
+
+    topology(Topology)
+        the board shape
+
+    trail(list)
+        if given, a (box, previous value) pair is appended for every change so
+        that the changes can be rolled back with `_undo`
+
+    scheduler(StrategyScheduler)
+        the expensive strategies (defaults to naked twins alone)
+
+    stats(SolveStats)
+        if given, the passes and the candidates removed by eliminate and only
+        choice are added to it
+
+    Returns
+    -------
+    dict or False
+        The values dictionary at the fixpoint, or False if a box runs out of digits
+    """
+    unitlist, peers, unit_ids = topology.unitlist, topology.peers, topology.unit_ids
+    solved = deque()        # boxes whose digit still has to be eliminated from their peers
+    pending = set()         # indexes into unitlist of units that need another look
+    record = history.append if history.enabled else None
+    scheduler = scheduler or _scheduler((), topology)
+    fruitless = {}
+    passes = eliminated = chosen = 0
+
+    def finish(result):
+        if stats is not None:
+            stats.passes += passes
+            stats.eliminations['eliminate'] += eliminated
+            stats.eliminations['only_choice'] += chosen
+        return result
+
+    def changed(box):
+        if len(values[box]) == 1:
+            solved.append(box)
+            if record is not None:
+                record((box, values[box]))
+        pending.update(unit_ids[box])
+
+    for box in dirty:
+        if not values[box]:
+            return finish(False)
+        if len(values[box]) == 1:
+            solved.append(box)
+        pending.update(unit_ids[box])
+
+    while True:
+        while solved or pending:
+            while solved:
+                box = solved.popleft()
+                digit = values[box]
+                for peer in peers[box]:
+                    if digit in values[peer]:
+                        if trail is not None:
+                            trail.append((peer, values[peer]))
+                        values[peer] = values[peer].replace(digit, '')
+                        eliminated += 1
+                        if not values[peer]:
+                            return finish(False)
+                        changed(peer)
+            if pending:
+                unit = unitlist[pending.pop()]
+                if trail is not None or stats is not None:
+                    before = [(box, values[box]) for box in unit]
+                for box in _only_choice_unit(values, unit, topology.digits):
+                    changed(box)
+                if trail is not None:
+                    trail.extend((box, old) for box, old in before if values[box] != old)
+                if stats is not None:
+                    chosen += sum(len(old) - len(values[box]) for box, old in before)
+                # a digit with nowhere left to go in the unit is a dead end, even though
+                # no single box has run out of digits yet
+                if len(set(''.join(values[box] for box in unit))) < len(unit):
+                    return finish(False)
+
+        # the cheap strategies have stalled; go back to the queue as soon as one
+        # of the expensive ones makes progress
+        passes += 1
+        diff = scheduler.escalate(values, topology, fruitless)
+        if not diff:
+            return finish(values)
+        if trail is not None:
+            trail.extend(diff.items())
+        for box in diff:
+            if not values[box]:
+                return finish(False)
+            changed(box)
+
+
+def reduce_puzzle(values, topology=None, strategies=()):
     """Reduce a Sudoku puzzle by repeatedly applying all constraint strategies
 
     Parameters
@@ -133,35 +280,108 @@ def reduce_puzzle(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    strategies(list or StrategyScheduler)
+        extra strategies (see strategies.py) to try, in order, after the
+        topology's constraint propagators and naked twins whenever eliminate
+        and only choice stall, or a StrategyScheduler that replaces the default
+        schedule after the constraint propagators
+
     Returns
     -------
     dict or False
         The values dictionary after continued application of the constraint strategies
         no longer produces any changes, or False if the puzzle is unsolvable 
+
+    Notes
+    -----
+    The reduction runs until no strategy removes any candidate. This is a
+    stronger fixpoint than stopping once a pass solves no new box, so some
+    boards end up with fewer candidates than that rule would leave them.
     """
     # TODO: Copy your code from the classroom and modify it to complete this function
     #raise NotImplementedError
-    stalled = False
-    while not stalled:
-        # Check how many boxes have a determined value
-        solved_values_before = len([box for box in values.keys() if len(values[box]) == 1])
-        # Use the Eliminate Strategy
-        values = eliminate(values)
-        # Use the Only Choice Strategy
-        values = only_choice(values)
-        # Use the Naked Twins Strategu
-        naked_twins(values)
-        # Check how many boxes have a determined value, to compare
-        solved_values_after = len([box for box in values.keys() if len(values[box]) == 1])
-        # If no new values were added, stop the loop.
-        stalled = solved_values_before == solved_values_after
-        # Sanity check, return False if there is a box with zero available values:
-        if len([box for box in values.keys() if len(values[box]) == 0]):
-            return False
-    return values
-
-
-def search(values):
+    # Every box starts out dirty; after that only boxes that change are revisited
+    topology = topology or default_topology
+    return _propagate(values, topology.boxes, topology, scheduler=_scheduler(strategies, topology))
+
+
+def _undo(values, trail, mark):
+    """Roll `values` back to the point where `trail` had `mark` entries """
+    while len(trail) > mark:
+        box, old = trail.pop()
+        values[box] = old
+
+
+def _timed_propagate(stats):
+    """`_propagate`, adding its counters and wall time to `stats` """
+    def propagate(values, dirty, topology, trail, scheduler):
+        start = perf_counter()
+        try:
+            return _propagate(values, dirty, topology, trail, scheduler, stats)
+        finally:
+            stats.seconds['propagate'] += perf_counter() - start
+    return propagate
+
+
+def _solutions_in_place(values, topology, scheduler, stats=None, token=None):
+    """Depth first search on a single values dictionary that is modified in place
+    and restored from an undo trail on backtracking, using an explicit stack of
+    (box, remaining digits, trail length) frames instead of recursion
+
+    Yields `values` itself every time it holds a solution; resuming the generator
+    backtracks into the next branch. Once the search space is exhausted `values`
+    is restored to its initial state. If `token` expires, `values` is rolled back
+    to the propagated givens and `Cancelled` is raised.
+    """
+    boxes = topology.boxes
+    trail = []
+    propagate = _propagate if stats is None else _timed_propagate(stats)
+    if propagate(values, boxes, topology, trail, scheduler) is False:
+        _undo(values, trail, 0)
+        return
+    reduced = len(trail)
+    stack = []
+    while True:
+        unfilled = [(len(values[s]), s) for s in boxes if len(values[s]) > 1]
+        if not unfilled:
+            yield values  ## Solved!
+        else:
+            n, s = min(unfilled)
+            stack.append((s, iter(values[s]), len(trail)))
+            if stats is not None:
+                stats.max_depth = max(stats.max_depth, len(stack))
+        while stack:
+            box, digits, mark = stack[-1]
+            _undo(values, trail, mark)
+            digit = next(digits, None)
+            if digit is None:
+                stack.pop()
+                continue
+            if token is not None and token.expired():
+                _undo(values, trail, reduced)
+                raise Cancelled(token.reason)
+            trail.append((box, values[box]))
+            assign_value(values, box, digit)
+            if stats is not None:
+                stats.nodes += 1
+            if propagate(values, [box], topology, trail, scheduler) is not False:
+                break
+            if stats is not None:
+                stats.backtracks += 1
+        else:
+            _undo(values, trail, 0)
+            return
+
+
+def _search_in_place(values, topology, scheduler, stats=None, token=None):
+    """The first solution of `_solutions_in_place`, or False """
+    return next(_solutions_in_place(values, topology, scheduler, stats, token), False)
+
+
+def search(values, in_place=False, topology=None, strategies=(), token=None):
     """Apply depth first search to solve Sudoku puzzles in order to solve puzzles
     that cannot be solved by repeated reduction alone.
 
@@ -170,6 +390,24 @@ def search(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    in_place(bool)
+        if True, search by modifying `values` itself and undoing changes on
+        backtracking instead of copying the dictionary at every branch; `values`
+        holds the solution on success and is restored on failure
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    strategies(list or StrategyScheduler)
+        extra strategies (see strategies.py) to try, in order, after the
+        topology's constraint propagators and naked twins whenever eliminate
+        and only choice stall, or a StrategyScheduler that replaces the default
+        schedule after the constraint propagators
+
+    token(CancelToken)
+        if given, checked before every branch; once it has expired the search
+        raises `cancel.Cancelled`, leaving `values` at the reduced givens
+
     Returns
     -------
     dict or False
@@ -182,22 +420,68 @@ def search(values):
     """
     # TODO: Copy your code from the classroom to complete this function
     #raise NotImplementedError
-    values = reduce_puzzle(values)
+    topology = topology or default_topology
+    boxes = topology.boxes
+    strategies = _scheduler(strategies, topology)
+    if in_place:
+        return _search_in_place(values, topology, strategies, token=token)
+    values = reduce_puzzle(values, topology, strategies)
     if values is False:
         return False ## Failed earlier
     if all(len(values[s]) == 1 for s in boxes): 
         return values ## Solved!
+    if token is not None:
+        token.check()
     # Choose one of the unfilled squares with the fewest possibilities
     n,s = min((len(values[s]), s) for s in boxes if len(values[s]) > 1)
     # Now use recurrence to solve each one of the resulting sudokus, and 
     for value in values[s]:
-        new_sudoku = values.copy()
-        new_sudoku[s] = value
-        attempt = search(new_sudoku)
+        new_sudoku = assign_value(values.copy(), s, value)
+        attempt = search(new_sudoku, topology=topology, strategies=strategies, token=token)
         if attempt:
             return attempt
 
-def solve(grid):
+def count_solutions(grid, limit=2, topology=None, strategies=()):
+    """Count the solutions of a Sudoku puzzle with the same propagation and search
+    as `solve`, stopping as soon as `limit` solutions have been found
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+    limit(int)
+        the number of solutions after which to stop counting, or None to count
+        every solution
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    strategies(list or StrategyScheduler)
+        extra strategies (see strategies.py) or a StrategyScheduler, as in `search`
+
+    Returns
+    -------
+    int
+        the number of solutions, capped at `limit`
+    """
+    topology = topology or default_topology
+    count = 0
+    if limit is not None and limit <= 0:
+        return count
+    for _ in _solutions_in_place(topology.grid2values(grid), topology, _scheduler(strategies, topology)):
+        count += 1
+        if count == limit:
+            break
+    return count
+
+
+def is_unique(grid, topology=None, strategies=()):
+    """True if the Sudoku puzzle has exactly one solution (see `count_solutions`) """
+    return count_solutions(grid, 2, topology, strategies) == 1
+
+
+def solve(grid, backend='dict', topology=None, strategies=(), stats=False, deadline=None, token=None):
     """Find the solution to a Sudoku puzzle using search and constraint propagation
 
     Parameters
@@ -207,19 +491,94 @@ def solve(grid):
         
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
 
+    backend(string)
+        'dict' searches on the dictionary representation; 'bitmask' runs the same
+        strategies on the flat bitmask board from `bitboard.py`; 'dlx' solves the
+        puzzle as an exact cover problem with dancing links (see `dlx.py`);
+        'split' searches sub-boards of the puzzle in parallel (see `split.py`)
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board); the grid has one
+        character per box, using the topology's digit symbols and '.' for blanks
+
+    strategies(list or StrategyScheduler)
+        extra strategies (see strategies.py) or a StrategyScheduler for the
+        'dict' backend, as in `search`
+
+    stats(bool)
+        if True, also return a `stats.SolveStats` for the solve; the 'bitmask'
+        and 'dlx' backends only fill in the total wall time
+
+    deadline(float)
+        a `time.monotonic()` timestamp at which the 'dict' search gives up
+
+    token(CancelToken)
+        a token that the 'dict' search checks before every branch, so that
+        another thread can cancel the solve
+
     Returns
     -------
     dict or False
         The dictionary representation of the final sudoku grid or False if no solution exists.
+        If the deadline passes or the token is cancelled first, a (falsy)
+        `cancel.PartialResult` with the reduced grid and the stats so far.
+        With `stats`, a (result, SolveStats) tuple.
     """
-    values = grid2values(grid)
-    values = search(values)
+    if deadline is not None or token is not None:
+        if backend != 'dict':
+            raise ValueError("Only the 'dict' backend supports deadlines and cancellation")
+        token = CancelToken(deadline, parent=token)
+    if not stats and token is None:
+        return _solve(grid, backend, topology or default_topology, strategies, None)
+    solve_stats = SolveStats()
+    start = perf_counter()
+    result = _solve(grid, backend, topology or default_topology, strategies, solve_stats, token)
+    seconds = solve_stats.seconds
+    seconds['total'] = perf_counter() - start
+    if backend == 'dict':
+        seconds['search'] = max(seconds['total'] - seconds['parse'] - seconds['propagate'], 0.0)
+    solve_stats.solved = bool(result)
+    return (result, solve_stats) if stats else result
+
+
+def _solve(grid, backend, topology, strategies, stats, token=None):
+    if backend == 'bitmask':
+        if topology is not default_topology:
+            raise ValueError("The bitmask backend only supports the default topology")
+        import bitboard
+        return bitboard.solve(grid)
+    if backend == 'dlx':
+        import dlx
+        return dlx.solve(grid, topology)
+    if backend == 'split':
+        import split
+        return split.solve(grid, topology, strategies)
+    if backend != 'dict':
+        raise ValueError("Unknown backend: {!r}".format(backend))
+    scheduler = _scheduler(strategies, topology)
+    if stats is None:
+        return _search_in_place(topology.grid2values(grid), topology, scheduler)
+
+    start = perf_counter()
+    values = topology.grid2values(grid)
+    stats.seconds['parse'] = perf_counter() - start
+    # the scheduler may be shared between solves, so count only this solve's share
+    before = {name: (s.removed, s.seconds) for name, s in scheduler.stats.items()}
+    try:
+        values = _search_in_place(values, topology, scheduler, stats, token)
+    except Cancelled as exc:
+        values = PartialResult(values, stats, exc.args[0])
+    for name, s in scheduler.stats.items():
+        removed, seconds = before[name]
+        stats.eliminations[name] += s.removed - removed
+        stats.strategy_seconds[name] += s.seconds - seconds
     return values
 
 
 if __name__ == "__main__":
     diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
     display(grid2values(diag_sudoku_grid))
+    history.enable()
     result = solve(diag_sudoku_grid)
     display(result)
 
@@ -0,0 +1,131 @@
+"""Parallel split-search for single hard puzzles.
+
+The first levels of the search tree are expanded breadth first in the calling
+process. Every branch that survives propagation becomes a sub-board, and the
+sub-boards are searched in a pool of worker processes. The first worker to find
+a solution wins, and sets a shared event that cancels the searches of all the
+others through their `CancelToken`.
+"""
+import os
+from multiprocessing import Event, Pool
+
+from batch import _init_worker
+from cancel import CancelToken, Cancelled
+from utils import assign_value
+from solution import default_topology, _propagate, _scheduler, _search_in_place
+
+
+def expand(values, topology, scheduler, boards):
+    """Split a puzzle into sub-boards by branching on the first levels of the
+    search tree
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    topology(Topology)
+        the board shape
+
+    scheduler(StrategyScheduler)
+        the strategies used to propagate every branch
+
+    boards(int)
+        keep expanding whole levels of the tree until there are at least this
+        many sub-boards
+
+    Returns
+    -------
+    tuple
+        (solution, sub-boards) where solution is a solved values dictionary
+        found during the expansion (or None), and sub-boards are the propagated,
+        still unsolved branches in search order
+    """
+    values = _propagate(dict(values), topology.boxes, topology, scheduler=scheduler)
+    if values and all(len(v) == 1 for v in values.values()):
+        return values, []
+    frontier = [values] if values else []
+    while frontier and len(frontier) < boards:
+        level = []
+        for board in frontier:
+            n, s = min((len(board[s]), s) for s in topology.boxes if len(board[s]) > 1)
+            for digit in board[s]:
+                child = assign_value(dict(board), s, digit)
+                if _propagate(child, [s], topology, scheduler=scheduler) is False:
+                    continue
+                if all(len(v) == 1 for v in child.values()):
+                    return child, []
+                level.append(child)
+        frontier = level
+    return None, frontier
+
+
+_stop = None
+
+
+def _init_split_worker(stop):
+    global _stop
+    _init_worker()
+    _stop = stop
+
+
+def _search_board(job):
+    values, topology, strategies = job
+    token = CancelToken(event=_stop) if _stop is not None else None
+    try:
+        return _search_in_place(values, topology, _scheduler(strategies, topology), token=token)
+    except Cancelled:
+        return False
+
+
+def solve(grid, topology=None, strategies=(), workers=None, boards=None):
+    """Find the solution to a Sudoku puzzle by searching sub-boards in parallel
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    strategies(list)
+        extra strategies (see strategies.py), as in `solution.search`
+
+    workers(int)
+        number of worker processes (defaults to the number of CPUs); with a
+        single worker the sub-boards are searched in the calling process
+
+    boards(int)
+        the minimum number of sub-boards to split the puzzle into (defaults to
+        twice the number of workers), so that a worker that finishes a dead
+        branch early can pick up another one
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    topology = topology or default_topology
+    workers = workers or os.cpu_count() or 1
+    scheduler = _scheduler(strategies, topology)
+    solved, subboards = expand(topology.grid2values(grid), topology, scheduler, boards or 2 * workers)
+    if solved is not None:
+        return solved
+    jobs = [(board, topology, strategies) for board in subboards]
+    if workers == 1 or len(jobs) <= 1:
+        return next((result for result in map(_search_board, jobs) if result), False)
+    stop = Event()
+    pool = Pool(min(workers, len(jobs)), initializer=_init_split_worker, initargs=(stop,))
+    try:
+        for result in pool.imap_unordered(_search_board, jobs):
+            if result:
+                return result
+        return False
+    finally:
+        # cancel the workers still searching other sub-boards and let them exit,
+        # rather than terminating them: a worker that inherited a SIGTERM handler
+        # (e.g. from SDL) would never exit, and terminate() would wait forever
+        stop.set()
+        pool.close()
+        pool.join()
@@ -0,0 +1,128 @@
+"""Instrumentation for `solution.solve`.
+
+`solve(grid, stats=True)` returns a `(result, SolveStats)` pair describing where
+the time went: how much propagation was done and by which strategy, how large
+the search tree was, and the wall time of each phase. A `StatsCollector` adds
+up the stats of many solves, e.g. from `batch.solve_many(..., collector=...)`.
+"""
+from collections import Counter
+
+
+PHASES = ('parse', 'propagate', 'search')
+
+
+def percentile(samples, q):
+    """The `q`th percentile (0-100) of `samples` by nearest rank, or 0.0 if empty """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(-(-q * len(ordered) // 100), 1)
+    return ordered[min(int(rank), len(ordered)) - 1]
+
+
+class SolveStats:
+    """Counters and timings for a single solve
+
+    Attributes
+    ----------
+    passes(int)
+        times propagation drained its work queue and escalated to the scheduled
+        strategies
+
+    eliminations(Counter)
+        candidates removed per strategy name ('eliminate', 'only_choice' and
+        every strategy of the scheduler)
+
+    strategy_seconds(Counter)
+        time spent in each scheduled strategy
+
+    nodes(int)
+        branch assignments tried by the search
+
+    backtracks(int)
+        branch assignments that propagation proved to be dead ends
+
+    max_depth(int)
+        deepest level of the search tree reached
+
+    seconds(dict)
+        wall time per phase: 'parse' (grid to values), 'propagate' (all
+        constraint propagation, including the scheduled strategies) and
+        'search' (choosing branches and undoing them); 'total' covers the whole
+        call to `solve`
+    """
+    __slots__ = ('passes', 'eliminations', 'strategy_seconds', 'nodes', 'backtracks',
+                 'max_depth', 'seconds', 'solved')
+
+    def __init__(self):
+        self.passes = 0
+        self.eliminations = Counter()
+        self.strategy_seconds = Counter()
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.seconds = dict.fromkeys(PHASES + ('total',), 0.0)
+        self.solved = False
+
+    def as_dict(self):
+        return {
+            'solved': self.solved,
+            'passes': self.passes,
+            'eliminations': dict(self.eliminations),
+            'strategy_seconds': dict(self.strategy_seconds),
+            'nodes': self.nodes,
+            'backtracks': self.backtracks,
+            'max_depth': self.max_depth,
+            'seconds': dict(self.seconds),
+        }
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        self.__init__()
+        for name, value in state.items():
+            setattr(self, name, Counter(value) if isinstance(getattr(self, name), Counter) else value)
+
+    def __repr__(self):
+        return 'SolveStats({})'.format(self.as_dict())
+
+
+class StatsCollector:
+    """Aggregate the `SolveStats` of many solves
+
+    Counters and timings are summed, except `max_depth`, which is the deepest
+    search of any solve. The total time of every solve is kept so that latency
+    percentiles can be reported.
+    """
+    def __init__(self):
+        self.totals = SolveStats()
+        self.puzzles = 0
+        self.solved = 0
+        self.latencies = []
+
+    def add(self, stats):
+        totals = self.totals
+        self.puzzles += 1
+        self.solved += bool(stats.solved)
+        totals.passes += stats.passes
+        totals.eliminations.update(stats.eliminations)
+        totals.strategy_seconds.update(stats.strategy_seconds)
+        totals.nodes += stats.nodes
+        totals.backtracks += stats.backtracks
+        totals.max_depth = max(totals.max_depth, stats.max_depth)
+        for phase, seconds in stats.seconds.items():
+            totals.seconds[phase] += seconds
+        self.latencies.append(stats.seconds['total'])
+
+    def percentile(self, q):
+        """The `q`th percentile (0-100) of the total solve times """
+        return percentile(self.latencies, q)
+
+    def summary(self):
+        """The aggregate statistics as plain dictionaries """
+        summary = self.totals.as_dict()
+        del summary['solved']
+        summary.update(puzzles=self.puzzles, solved=self.solved,
+                       p50=self.percentile(50), p95=self.percentile(95), p99=self.percentile(99))
+        return summary
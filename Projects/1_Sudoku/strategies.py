@@ -0,0 +1,170 @@
+"""Advanced propagation strategies that plug into `solution.reduce_puzzle`.
+
+Every strategy has the same signature as the strategies in solution.py: it takes
+a values dictionary and an optional `Topology`, removes candidates in place, and
+returns the values dictionary. Pass any of them to `reduce_puzzle`, `search` or
+`solve` through the `strategies` argument. They run, cheapest first, whenever
+eliminate, only choice and naked twins have stalled:
+
+    solve(grid, strategies=strategies.ALL)
+
+or wrap them in a `scheduler.StrategyScheduler` to collect per-strategy
+statistics and cut off strategies that keep coming up empty.
+"""
+from functools import lru_cache
+from itertools import combinations
+
+from solution import default_topology
+
+
+def _remove(values, box, digits):
+    """Remove `digits` from the candidates of `box` """
+    for digit in digits:
+        values[box] = values[box].replace(digit, '')
+
+
+def _naked_subsets(values, topology, size):
+    for unit in topology.unitlist:
+        open_boxes = [box for box in unit if 1 < len(values[box]) <= size]
+        for group in combinations(open_boxes, size):
+            digits = set(''.join(values[box] for box in group))
+            if len(digits) != size:
+                continue
+            for box in unit:
+                if box not in group and len(values[box]) > 1:
+                    _remove(values, box, digits)
+    return values
+
+
+def _hidden_subsets(values, topology, size):
+    for unit in topology.unitlist:
+        places = {d: [box for box in unit if d in values[box]] for d in topology.digits}
+        open_digits = [d for d, boxes in places.items() if 1 < len(boxes) <= size]
+        for group in combinations(open_digits, size):
+            boxes = set(box for d in group for box in places[d])
+            if len(boxes) != size:
+                continue
+            for box in boxes:
+                _remove(values, box, [d for d in values[box] if d not in group])
+    return values
+
+
+def naked_triples(values, topology=None):
+    """Eliminate values using the naked triples strategy
+
+    If three unsolved boxes in a unit have only three digits between them, those
+    digits can be eliminated from every other box in the unit.
+    """
+    return _naked_subsets(values, topology or default_topology, 3)
+
+
+def naked_quads(values, topology=None):
+    """Eliminate values using the naked quads strategy
+
+    If four unsolved boxes in a unit have only four digits between them, those
+    digits can be eliminated from every other box in the unit.
+    """
+    return _naked_subsets(values, topology or default_topology, 4)
+
+
+def hidden_pairs(values, topology=None):
+    """Eliminate values using the hidden pairs strategy
+
+    If two digits can only go in the same two boxes of a unit, every other digit
+    can be eliminated from those two boxes.
+    """
+    return _hidden_subsets(values, topology or default_topology, 2)
+
+
+def hidden_triples(values, topology=None):
+    """Eliminate values using the hidden triples strategy
+
+    If three digits can only go in the same three boxes of a unit, every other
+    digit can be eliminated from those three boxes.
+    """
+    return _hidden_subsets(values, topology or default_topology, 3)
+
+
+@lru_cache()
+def _intersections(topology, pointing):
+    """(source, overlap, outside) for every square and line unit that share at
+    least two boxes, where overlap is the set of shared boxes and outside lists
+    the boxes of the target unit that are not in the source unit
+    """
+    lines = topology.row_units + topology.column_units + topology.diagonal_units
+    triples = []
+    for square in topology.square_units:
+        for line in lines:
+            overlap = set(square) & set(line)
+            if len(overlap) >= 2:
+                source, target = (square, line) if pointing else (line, square)
+                triples.append((source, overlap, [box for box in target if box not in overlap]))
+    return triples
+
+
+def _intersection_removal(values, topology, pointing):
+    for source, overlap, outside in _intersections(topology, pointing):
+        for digit in topology.digits:
+            places = [box for box in source if digit in values[box]]
+            if len(places) < 2 or not overlap.issuperset(places):
+                continue
+            for box in outside:
+                if len(values[box]) > 1 and digit in values[box]:
+                    _remove(values, box, digit)
+    return values
+
+
+def pointing_pairs(values, topology=None):
+    """Eliminate values using the pointing pairs strategy
+
+    If every box of a square that can hold a digit lies on the same row, column
+    or diagonal, the digit can be eliminated from the rest of that line.
+    """
+    return _intersection_removal(values, topology or default_topology, pointing=True)
+
+
+def box_line_reduction(values, topology=None):
+    """Eliminate values using the box/line reduction strategy
+
+    If every box of a row, column or diagonal that can hold a digit lies in the
+    same square, the digit can be eliminated from the rest of that square.
+    """
+    return _intersection_removal(values, topology or default_topology, pointing=False)
+
+
+def _fish(values, lines, crossing, digit):
+    # lines and crossing are both lists of units that partition the board
+    position = {box: i for i, unit in enumerate(crossing) for box in unit}
+    spots = {}
+    for line in lines:
+        cols = tuple(sorted(position[box] for box in line if digit in values[box]))
+        if len(cols) == 2:
+            spots.setdefault(cols, []).append(line)
+    for cols, pair in spots.items():
+        if len(pair) != 2:
+            continue
+        for col in cols:
+            for box in crossing[col]:
+                if box not in pair[0] and box not in pair[1] and len(values[box]) > 1 and digit in values[box]:
+                    _remove(values, box, digit)
+
+
+def x_wing(values, topology=None):
+    """Eliminate values using the X-wing strategy
+
+    If a digit can only go in the same two columns of two different rows, it can
+    be eliminated from every other box in those two columns (and likewise with
+    rows and columns swapped).
+    """
+    topology = topology or default_topology
+    for digit in topology.digits:
+        _fish(values, topology.row_units, topology.column_units, digit)
+        _fish(values, topology.column_units, topology.row_units, digit)
+    return values
+
+
+# every strategy, roughly from the cheapest to the most expensive
+ALL = [hidden_pairs, pointing_pairs, box_line_reduction, naked_triples,
+       hidden_triples, x_wing, naked_quads]
+
+STRATEGIES = {strategy.__name__: strategy for strategy in ALL}
@@ -0,0 +1,183 @@
+"""Benchmark the solver on fixed puzzle sets and compare runs.
+
+Run it from the project directory:
+
+    python -m tests.benchmark --output before.json
+    ... change something ...
+    python -m tests.benchmark --output after.json --compare before.json
+
+Three puzzle sets are used, all deterministic so that every run sees the same
+puzzles:
+
+- easy: classic puzzles with 45 clues, cut from the solutions of the hard set
+- hard: the classic puzzles in tests/puzzles/hard.txt
+- diagonal: diagonal puzzles with 28 clues, cut from symmetric images of the
+  solution of the example puzzle
+
+For every set the runner times `solve`, `reduce_puzzle` on the initial values,
+and each strategy (naked twins and everything in strategies.py) on the reduced
+values, and reports puzzles/sec with p50, p95 and p99 latency.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+from time import perf_counter
+
+import dlx
+import solution
+import strategies
+from cache import TRANSFORMS
+from corpus import iter_grids
+from stats import percentile
+from topology import get_topology
+
+
+HARD_PUZZLES = os.path.join(os.path.dirname(__file__), 'puzzles', 'hard.txt')
+DIAGONAL_EXAMPLE = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+STRATEGIES = [solution.naked_twins] + strategies.ALL
+
+
+def _cut(solved, clues, rng):
+    keep = set(rng.sample(range(len(solved)), clues))
+    return ''.join(d if i in keep else '.' for i, d in enumerate(solved))
+
+
+def puzzle_sets(size=20, seed=0):
+    """The benchmark puzzle sets
+
+    Parameters
+    ----------
+    size(int)
+        number of generated puzzles in the easy and diagonal sets
+
+    seed(int)
+        seed for the random clue selection
+
+    Returns
+    -------
+    dict
+        maps a set name to a (topology, list of grid strings) pair
+    """
+    rng = random.Random(seed)
+    classic = get_topology(3, diagonal=False)
+    hard = list(iter_grids(HARD_PUZZLES))
+    solutions = [classic.values2grid(dlx.solve(grid, classic)) for grid in hard]
+    easy = [_cut(solutions[i % len(solutions)], 45, rng) for i in range(size)]
+
+    solved = solution.default_topology.values2grid(solution.solve(DIAGONAL_EXAMPLE))
+    diagonal = []
+    for i in range(size):
+        image = ''.join(map(solved.__getitem__, TRANSFORMS[i * 7 % len(TRANSFORMS)]))
+        labels = rng.sample('123456789', 9)
+        diagonal.append(_cut(image.translate(str.maketrans('123456789', ''.join(labels))), 28, rng))
+    return {'easy': (classic, easy), 'hard': (classic, hard), 'diagonal': (solution.default_topology, diagonal)}
+
+
+def _timings(seconds):
+    """puzzles/sec and latency percentiles (in milliseconds) of a list of timings """
+    total = sum(seconds)
+    return {
+        'puzzles': len(seconds),
+        'per_sec': len(seconds) / total if total else 0.0,
+        'mean_ms': 1000 * total / len(seconds) if seconds else 0.0,
+        'p50_ms': 1000 * percentile(seconds, 50),
+        'p95_ms': 1000 * percentile(seconds, 95),
+        'p99_ms': 1000 * percentile(seconds, 99),
+    }
+
+
+def _time(fn, *args):
+    start = perf_counter()
+    fn(*args)
+    return perf_counter() - start
+
+
+def bench_set(topology, grids, repeat=1):
+    """Time `solve`, `reduce_puzzle` and every strategy on one puzzle set
+
+    Returns
+    -------
+    dict
+        maps a benchmark name ('solve', 'reduce_puzzle' or 'strategy.<name>')
+        to the summary of its timings
+    """
+    results = {'solve': [], 'reduce_puzzle': []}
+    results.update(('strategy.' + s.__name__, []) for s in STRATEGIES)
+    for _ in range(repeat):
+        for grid in grids:
+            results['solve'].append(_time(solution.solve, grid, 'dict', topology))
+            values = topology.grid2values(grid)
+            results['reduce_puzzle'].append(_time(solution.reduce_puzzle, dict(values), topology))
+            reduced = solution.reduce_puzzle(values, topology) or values
+            for strategy in STRATEGIES:
+                results['strategy.' + strategy.__name__].append(_time(strategy, dict(reduced), topology))
+    return {name: _timings(seconds) for name, seconds in results.items()}
+
+
+def run(size=20, repeat=1, seed=0):
+    """Run every benchmark and return the report as a JSON-serialisable dict """
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'size': size,
+        'repeat': repeat,
+        'seed': seed,
+        'sets': {},
+    }
+    for name, (topology, grids) in puzzle_sets(size, seed).items():
+        report['sets'][name] = bench_set(topology, grids, repeat)
+    return report
+
+
+def compare(base, new):
+    """Rows of (set, benchmark, base p50, new p50, speedup) for two reports """
+    rows = []
+    for set_name, benches in new['sets'].items():
+        for bench, timings in benches.items():
+            old = base.get('sets', {}).get(set_name, {}).get(bench)
+            if old is None:
+                continue
+            speedup = old['p50_ms'] / timings['p50_ms'] if timings['p50_ms'] else float('inf')
+            rows.append((set_name, bench, old['p50_ms'], timings['p50_ms'], speedup))
+    return rows
+
+
+def _print_report(report, out):
+    out.write('{:<10} {:<30} {:>10} {:>9} {:>9} {:>9}\n'.format('set', 'benchmark', 'puzzles/s', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for set_name, benches in report['sets'].items():
+        for bench, t in benches.items():
+            out.write('{:<10} {:<30} {:>10.1f} {:>9.3f} {:>9.3f} {:>9.3f}\n'.format(
+                set_name, bench, t['per_sec'], t['p50_ms'], t['p95_ms'], t['p99_ms']))
+
+
+def _print_comparison(rows, out):
+    out.write('{:<10} {:<30} {:>10} {:>10} {:>8}\n'.format('set', 'benchmark', 'base p50', 'new p50', 'speedup'))
+    for set_name, bench, old, new, speedup in rows:
+        out.write('{:<10} {:<30} {:>10.3f} {:>10.3f} {:>7.2f}x\n'.format(set_name, bench, old, new, speedup))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=20, help='puzzles in the generated sets')
+    parser.add_argument('--repeat', type=int, default=1, help='passes over every set')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='save the report as JSON')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against a saved JSON report')
+    args = parser.parse_args(argv)
+
+    report = run(args.size, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            _print_comparison(compare(json.load(f), report), sys.stdout)
+    else:
+        _print_report(report, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
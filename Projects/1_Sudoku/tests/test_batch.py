@@ -0,0 +1,24 @@
+import unittest
+
+import solution
+from batch import solve_many, imap_solve
+from tests import test_solution
+
+
+class TestBatch(unittest.TestCase):
+    grids = [test_solution.TestDiagonalSudoku.diagonal_grid, '22' + '.' * 79] * 3
+
+    def test_solve_many(self):
+        expected = [solution.solve(grid) for grid in self.grids]
+        self.assertEqual(solve_many(self.grids, workers=2, chunksize=2), expected)
+        self.assertEqual(solve_many(self.grids, workers=1), expected)
+
+    def test_imap_solve(self):
+        results = dict(imap_solve(iter(self.grids), workers=2, backend='bitmask'))
+        self.assertEqual(sorted(results), list(range(len(self.grids))))
+        for index, grid in enumerate(self.grids):
+            self.assertEqual(results[index], solution.solve(grid))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+from tests import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_puzzle_sets_are_deterministic(self):
+        first, second = benchmark.puzzle_sets(size=3), benchmark.puzzle_sets(size=3)
+        self.assertEqual(sorted(first), ['diagonal', 'easy', 'hard'])
+        for name, (topology, grids) in first.items():
+            self.assertEqual(grids, second[name][1])
+            self.assertTrue(all(len(grid) == len(topology.boxes) for grid in grids))
+
+    def test_run_and_compare(self):
+        report = benchmark.run(size=2)
+        timings = report['sets']['diagonal']['solve']
+        self.assertEqual(timings['puzzles'], 2)
+        self.assertLessEqual(timings['p50_ms'], timings['p99_ms'])
+        self.assertIn('strategy.naked_twins', report['sets']['hard'])
+        rows = benchmark.compare(report, report)
+        self.assertTrue(rows)
+        self.assertTrue(all(speedup == 1 for *_, speedup in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
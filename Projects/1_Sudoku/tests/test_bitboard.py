@@ -0,0 +1,42 @@
+import unittest
+
+import bitboard
+import solution
+from utils import grid2values
+from tests import test_solution
+
+
+class TestBitboard(unittest.TestCase):
+
+    def test_round_trip(self):
+        values = test_solution.TestNakedTwins.before_naked_twins_1
+        self.assertEqual(bitboard.board2values(bitboard.values2board(values)), values)
+
+    def test_naked_twins(self):
+        for before, expected in [(test_solution.TestNakedTwins.before_naked_twins_1, test_solution.TestNakedTwins.possible_solutions_1),
+                                 (test_solution.TestNakedTwins.before_naked_twins_2, test_solution.TestNakedTwins.possible_solutions_2)]:
+            board = bitboard.naked_twins(bitboard.values2board(before))
+            self.assertIn(bitboard.board2values(board), expected)
+
+    def test_eliminate_matches_dict(self):
+        values = grid2values(test_solution.TestDiagonalSudoku.diagonal_grid)
+        board = bitboard.eliminate(bitboard.values2board(values))
+        self.assertEqual(bitboard.board2values(board), solution.eliminate(dict(values)))
+
+    def test_solve(self):
+        self.assertEqual(solution.solve(test_solution.TestDiagonalSudoku.diagonal_grid, backend='bitmask'),
+                         test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_unsolvable(self):
+        grid = '22' + '.' * 79
+        self.assertFalse(bitboard.solve(grid))
+
+    def test_invalid_grid(self):
+        for grid in ('x' + '.' * 80, '0' + '.' * 80, '.' * 80):
+            with self.assertRaises(ValueError):
+                bitboard.solve(grid)
+            with self.assertRaises(ValueError):
+                solution.solve(grid, backend='bitmask')
+
+if __name__ == '__main__':
+    unittest.main()
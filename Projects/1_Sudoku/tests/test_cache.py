@@ -0,0 +1,74 @@
+import os
+import random
+import tempfile
+import unittest
+
+import solution
+from cache import TRANSFORMS, SolutionCache, canonical_form
+from utils import values2grid
+from tests import test_solution
+
+
+def transform(grid, perm, digits):
+    """Apply a board symmetry and a digit relabeling to a grid """
+    image = ''.join(grid[i] for i in perm)
+    return image.translate(str.maketrans('123456789', digits))
+
+
+class TestCache(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+
+    def isomorphic_grids(self, count, seed=0):
+        rng = random.Random(seed)
+        for _ in range(count):
+            yield transform(self.grid, rng.choice(TRANSFORMS), ''.join(rng.sample('123456789', 9)))
+
+    def test_transforms_preserve_units(self):
+        index = {box: i for i, box in enumerate(solution.boxes)}
+        units = {frozenset(index[box] for box in unit) for unit in solution.unitlist}
+        self.assertEqual(len(set(TRANSFORMS)), 96)
+        for perm in TRANSFORMS:
+            self.assertEqual({frozenset(perm[i] for i in unit) for unit in units}, units)
+
+    def test_canonical_form_is_invariant(self):
+        canon = canonical_form(self.grid)[0]
+        for grid in self.isomorphic_grids(10):
+            self.assertEqual(canonical_form(grid)[0], canon)
+
+    def test_hits_return_solutions(self):
+        cache = SolutionCache()
+        for grid in [self.grid] + list(self.isomorphic_grids(10)):
+            self.assertEqual(cache.solve(grid), solution.solve(grid))
+        self.assertEqual((cache.hits, cache.misses), (10, 1))
+        self.assertFalse(cache.solve('22' + '.' * 79))
+        self.assertFalse(cache.solve('22' + '.' * 79))
+        self.assertEqual(cache.hits, 11)
+
+    def test_sparse_puzzle(self):
+        # a puzzle using only some digits has many solutions; any valid one will do
+        cache = SolutionCache()
+        sparse = '1' + '.' * 79 + '2'
+        cache.solve(sparse)
+        other = '3' + '.' * 79 + '7'
+        result = cache.solve(other)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(result['A1'], '3')
+        self.assertEqual(result['I9'], '7')
+        for unit in solution.unitlist:
+            self.assertEqual(sorted(result[box] for box in unit), list('123456789'))
+
+    def test_lru_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'solutions')
+            with SolutionCache(maxsize=1, path=path) as cache:
+                cache.solve(self.grid)
+                cache.solve('22' + '.' * 79)
+                self.assertEqual(len(cache._entries), 1)
+            with SolutionCache(maxsize=1, path=path) as cache:
+                result = cache.solve(next(self.isomorphic_grids(1)))
+                self.assertEqual(cache.misses, 0)
+                self.assertEqual(values2grid(result).count('.'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import time
+import unittest
+
+import solution
+from cancel import CancelToken, Cancelled, PartialResult
+from tests import test_solution
+
+
+class TestCancellation(unittest.TestCase):
+    sparse_grid = test_solution.TestSearchInPlace.sparse_grid
+
+    def test_expired_deadline_returns_partial_result(self):
+        result = solution.solve(self.sparse_grid, deadline=time.monotonic())
+        self.assertIsInstance(result, PartialResult)
+        self.assertFalse(result)
+        self.assertEqual(result.reason, 'deadline')
+        self.assertEqual(result.values, solution.reduce_puzzle(solution.grid2values(self.sparse_grid)))
+        self.assertEqual(result.stats.nodes, 0)
+        self.assertFalse(result.stats.solved)
+
+    def test_generous_deadline(self):
+        result = solution.solve(self.sparse_grid, deadline=time.monotonic() + 60)
+        self.assertEqual(result, solution.solve(self.sparse_grid))
+        result, stats = solution.solve(self.sparse_grid, deadline=time.monotonic() + 60, stats=True)
+        self.assertTrue(stats.solved)
+
+    def test_propagation_alone_is_not_cancelled(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(solution.solve(grid, deadline=time.monotonic()), solution.solve(grid))
+
+    def test_cancelled_token(self):
+        parent = CancelToken()
+        parent.cancel()
+        result = solution.solve(self.sparse_grid, token=CancelToken(parent=parent))
+        self.assertEqual(result.reason, 'cancelled')
+
+    def test_search_raises(self):
+        token = CancelToken.after(0)
+        for in_place in (True, False):
+            values = solution.grid2values(self.sparse_grid)
+            with self.assertRaises(Cancelled):
+                solution.search(values, in_place=in_place, token=token)
+            self.assertEqual(values, solution.reduce_puzzle(solution.grid2values(self.sparse_grid)))
+
+    def test_other_backends_rejected(self):
+        self.assertRaises(ValueError, solution.solve, self.sparse_grid, backend='dlx', deadline=time.monotonic())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import pickle
+import random
+import unittest
+
+import dlx
+import generator
+import solution
+from constraints import AntiKnight, KillerCages, Windoku, cage_combinations
+from scheduler import StrategyScheduler
+from solution import naked_twins
+from topology import get_topology
+
+
+class TestConstraints(unittest.TestCase):
+    classic = get_topology(3, diagonal=False)
+
+    def assertSolved(self, values, topology):
+        for unit in topology.unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), sorted(topology.digits))
+        for box in topology.boxes:
+            for peer in topology.peers[box]:
+                self.assertNotEqual(values[box], values[peer])
+
+    def test_topology_tables(self):
+        topology = get_topology(3, diagonal=False, constraints=[Windoku(), AntiKnight()])
+        self.assertIs(topology, get_topology(3, False, (Windoku(), AntiKnight())))
+        self.assertEqual(len(topology.unitlist), 27 + 4)
+        self.assertIn(['B2', 'B3', 'B4', 'C2', 'C3', 'C4', 'D2', 'D3', 'D4'], topology.unitlist)
+        self.assertTrue({'B3', 'C2'} <= topology.peers['A1'])
+        self.assertIs(pickle.loads(pickle.dumps(topology)), topology)
+
+    def test_cage_combinations(self):
+        self.assertEqual(cage_combinations('123456789', 2, 3), (frozenset('12'),))
+        self.assertEqual(len(cage_combinations('123456789', 3, 15)), 8)
+        self.assertEqual(cage_combinations('123456789', 2, 18), ())
+
+    def test_variant_puzzles(self):
+        for constraints in ([Windoku()], [AntiKnight()]):
+            topology = get_topology(3, diagonal=False, constraints=constraints)
+            puzzle = generator.make_puzzle(26, seed=1, topology=topology)
+            self.assertTrue(solution.is_unique(puzzle, topology))
+            self.assertFalse(solution.is_unique(puzzle, self.classic))
+            self.assertSolved(solution.solve(puzzle, topology=topology), topology)
+
+    def test_killer_cages(self):
+        solved = generator.full_grid(random.Random(5), self.classic)
+        cages = []
+        for row in self.classic.row_units:
+            for i in range(0, 8, 2):
+                cages.append((sum(int(solved[self.classic.index[box]]) for box in row[i:i + 2]), row[i:i + 2]))
+        topology = get_topology(3, diagonal=False, constraints=[KillerCages(cages)])
+        values = solution.solve('.' * 72 + solved[72:], topology=topology)
+        self.assertSolved(values, topology)
+        for total, boxes in cages:
+            self.assertEqual(sum(int(values[box]) for box in boxes), total)
+        self.assertRaises(ValueError, KillerCages, [(3, ['A1', 'A1'])])
+
+    def test_killer_contradiction(self):
+        topology = get_topology(3, diagonal=False, constraints=[KillerCages([(3, ['A1', 'A2'])])])
+        self.assertFalse(solution.solve('8' + '.' * 80, topology=topology))
+        self.assertRaises(ValueError, dlx.solve, '.' * 81, topology)
+
+    def test_killer_cages_with_scheduler(self):
+        topology = get_topology(3, diagonal=False, constraints=[KillerCages([(17, ['A1', 'A2'])])])
+        cage = topology.strategies[0]
+        for scheduler in (StrategyScheduler([naked_twins]),
+                          StrategyScheduler([naked_twins, cage], {cage.__name__: 0})):
+            values = solution.solve('.' * 81, topology=topology, strategies=scheduler)
+            self.assertSolved(values, topology)
+            self.assertEqual(int(values['A1']) + int(values['A2']), 17)
+            self.assertGreater(scheduler.stats[cage.__name__].calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
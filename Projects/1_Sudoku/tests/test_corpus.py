@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+import solution
+from corpus import iter_grids, iter_puzzles, GridWriter, solve_corpus
+from utils import grid2values, values2grid
+from tests import test_solution
+
+
+class TestCorpus(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'puzzles.txt')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        with GridWriter(self.path) as out:
+            out.write(self.grid)
+            out.write(grid2values(self.grid))
+        with open(self.path, 'a') as f:
+            f.write('\r\n')
+        self.assertEqual(list(iter_grids(self.path)), [self.grid, self.grid])
+        self.assertEqual(list(iter_puzzles(self.path)), [grid2values(self.grid)] * 2)
+
+    def test_empty_file(self):
+        open(self.path, 'w').close()
+        self.assertEqual(list(iter_grids(self.path)), [])
+
+    def test_bad_record(self):
+        with open(self.path, 'w') as f:
+            f.write('123\n')
+        with self.assertRaises(ValueError):
+            list(iter_grids(self.path))
+
+    def test_solve_corpus(self):
+        unsolvable = '22' + '.' * 79
+        with GridWriter(self.path) as out:
+            out.write(self.grid)
+            out.write(unsolvable)
+        dst = os.path.join(self.tmpdir.name, 'solved.txt')
+        self.assertEqual(solve_corpus(self.path, dst), 2)
+        self.assertEqual(list(iter_grids(dst)), [values2grid(solution.solve(self.grid)), unsolvable])
+
+
+if __name__ == '__main__':
+    unittest.main()
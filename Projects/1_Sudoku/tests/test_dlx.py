@@ -0,0 +1,48 @@
+import unittest
+
+import dlx
+import solution
+from topology import get_topology
+from tests import test_solution
+from tests.test_topology import pattern_grid
+
+
+class TestDLX(unittest.TestCase):
+
+    def assertSolves(self, values, grid, topology):
+        for unit in topology.unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), sorted(topology.digits))
+        for box, given in zip(topology.boxes, grid):
+            self.assertIn(given, ('.', values[box]))
+
+    def test_solve(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(solution.solve(grid, backend='dlx'), test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+        # the sparse grid has many solutions, so any of them will do
+        grid = test_solution.TestSearchInPlace.sparse_grid
+        self.assertSolves(solution.solve(grid, backend='dlx'), grid, solution.default_topology)
+
+    def test_other_topology(self):
+        topology = get_topology(4, diagonal=False)
+        grid = pattern_grid(topology, 120)
+        self.assertSolves(dlx.solve(grid, topology), grid, topology)
+
+    def test_unsolvable(self):
+        self.assertFalse(dlx.solve('22' + '.' * 79))
+        self.assertFalse(dlx.solve('2' + '.' * 9 + '2' + '.' * 70))
+
+    def test_iter_solutions(self):
+        topology = get_topology(2, diagonal=False)
+        solutions = list(dlx.iter_solutions('.' * 16, topology))
+        self.assertEqual(len(solutions), 288)
+        self.assertEqual(len(set(topology.values2grid(s) for s in solutions)), 288)
+
+    def test_grid_length(self):
+        for grid in ('.' * 80, '.' * 82):
+            with self.assertRaises(ValueError):
+                dlx.solve(grid)
+            with self.assertRaises(ValueError):
+                solution.solve(grid, backend='dlx')
+
+if __name__ == '__main__':
+    unittest.main()
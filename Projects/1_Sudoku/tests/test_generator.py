@@ -0,0 +1,70 @@
+import multiprocessing
+import random
+import signal
+import unittest
+
+import generator
+import solution
+from topology import get_topology
+
+
+class TestGenerator(unittest.TestCase):
+
+    def test_full_grid(self):
+        grid = generator.full_grid(random.Random(0))
+        self.assertNotIn('.', grid)
+        self.assertEqual(solution.default_topology.values2grid(solution.solve(grid)), grid)
+
+    def test_dig_keeps_solution_unique(self):
+        rng = random.Random(1)
+        solved = generator.full_grid(rng)
+        puzzle = generator.dig(solved, 26, rng)
+        self.assertTrue(solution.is_unique(puzzle))
+        self.assertEqual(solution.default_topology.values2grid(solution.solve(puzzle)), solved)
+
+    def test_dig_matches_search_from_scratch(self):
+        topology = solution.default_topology
+        for seed in range(4):
+            rng = random.Random(seed)
+            solved = generator.full_grid(rng)
+            puzzle = generator.dig(solved, 24, random.Random(seed))
+            expected = list(solved)
+            for pos in random.Random(seed).sample(range(len(solved)), len(solved)):
+                if len(expected) - expected.count('.') <= 24:
+                    break
+                digit, expected[pos] = expected[pos], '.'
+                if not solution.is_unique(''.join(expected)):
+                    expected[pos] = digit
+            self.assertEqual(puzzle, ''.join(expected))
+
+    def test_make_puzzle(self):
+        puzzle = generator.make_puzzle(clues=28, seed=2)
+        self.assertEqual(len(puzzle) - puzzle.count('.'), 28)
+        self.assertTrue(solution.is_unique(puzzle))
+        self.assertEqual(generator.make_puzzle(clues=28, seed=2), puzzle)
+        hard = generator.make_puzzle(clues=26, difficulty='hard', seed=3)
+        self.assertEqual(generator.rate(hard), 'hard')
+        self.assertRaises(ValueError, generator.make_puzzle, difficulty='fiendish')
+
+    def test_other_topology(self):
+        topology = get_topology(2, diagonal=False)
+        puzzle = generator.make_puzzle(clues=6, seed=0, topology=topology)
+        self.assertTrue(solution.is_unique(puzzle, topology))
+
+    def test_generate_in_parallel(self):
+        puzzles = generator.generate(4, clues=28, workers=2, seed=5)
+        self.assertEqual(puzzles, generator.generate(4, clues=28, workers=1, seed=5))
+        self.assertTrue(all(solution.is_unique(puzzle) for puzzle in puzzles))
+
+    def test_pool_shuts_down_with_sigterm_handler(self):
+        # workers that inherit a SIGTERM handler (as with SDL) must still exit
+        previous = signal.signal(signal.SIGTERM, lambda signum, frame: None)
+        try:
+            puzzles = generator.generate(2, clues=30, workers=2, seed=3)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        self.assertEqual(len(puzzles), 2)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+if __name__ == '__main__':
+    unittest.main()
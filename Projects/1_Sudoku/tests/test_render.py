@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+import solution
+from tests import test_solution
+from utils import grid2values, history, reconstruct
+
+try:
+    import pygame
+    import PySudoku
+except ImportError:
+    PySudoku = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+@unittest.skipIf(PySudoku is None, "pygame is not installed")
+class TestRenderer(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+
+    @classmethod
+    def setUpClass(cls):
+        cls.video_driver = os.environ.get("SDL_VIDEODRIVER")
+        history.enable()
+        try:
+            cls.result = solution.solve(cls.grid)
+            cls.trail = list(history)
+        finally:
+            history.disable()
+            history.clear()
+        cls.assignments = reconstruct(cls.result, cls.trail)
+
+    @classmethod
+    def tearDownClass(cls):
+        # SDL installs signal handlers, which would be inherited by worker
+        # processes forked by later tests
+        pygame.quit()
+        if cls.video_driver is None:
+            os.environ.pop("SDL_VIDEODRIVER", None)
+        else:
+            os.environ["SDL_VIDEODRIVER"] = cls.video_driver
+
+    def test_only_changed_squares_are_redrawn(self):
+        renderer = PySudoku.Renderer(grid2values(self.grid), headless=True)
+        box, value = self.assignments[0]
+        renderer.assign(box, value)
+        self.assertEqual(len(renderer.dirty), 1)
+        self.assertLessEqual(renderer.dirty[0].width * renderer.dirty[0].height, 45 * 40)
+        renderer.assign(box, value)     # unchanged, nothing to redraw
+        self.assertEqual(len(renderer.dirty), 1)
+        renderer.flush()
+        self.assertEqual(renderer.dirty, [])
+
+    def test_export_frames(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            count = PySudoku.export(grid2values(self.grid), self.result, self.trail,
+                                    frames_dir=tmp, per_frame=4)
+            self.assertEqual(count, 1 + -(-len(self.assignments) // 4))
+            self.assertEqual(len([f for f in os.listdir(tmp) if f.endswith('.png')]), count)
+
+    def test_export_unlimited_fps(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            count = PySudoku.export(grid2values(self.grid), self.result, self.trail,
+                                    frames_dir=tmp, fps=0, per_frame=len(self.assignments))
+            self.assertEqual(count, 2)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_export_gif(self):
+        from PIL import ImageChops, ImageStat
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'solve.gif')
+            count = PySudoku.export(grid2values(self.grid), self.result, self.trail, gif=path, per_frame=8)
+            with Image.open(path) as gif:
+                self.assertEqual(gif.n_frames, count)
+                first = gif.convert('RGB')
+                gif.seek(count - 1)
+                last = gif.convert('RGB')
+        # the last frame, patched together from dirty rects, shows the solved board
+        solved = PySudoku.Renderer(self.result, headless=True).frame()
+
+        def error(image):
+            return sum(ImageStat.Stat(ImageChops.difference(image, solved)).mean)
+        self.assertLess(error(last), error(first) / 4)
+
+if __name__ == '__main__':
+    unittest.main()
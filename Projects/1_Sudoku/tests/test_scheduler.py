@@ -0,0 +1,57 @@
+import os
+import unittest
+
+import solution
+import strategies
+from corpus import iter_grids
+from scheduler import StrategyScheduler
+from topology import get_topology
+
+
+HARD_PUZZLES = os.path.join(os.path.dirname(__file__), 'puzzles', 'hard.txt')
+
+
+class TestStrategyScheduler(unittest.TestCase):
+    topology = get_topology(3, diagonal=False)
+
+    def setUp(self):
+        self.grids = list(iter_grids(HARD_PUZZLES))
+
+    def test_stats_are_collected(self):
+        scheduler = StrategyScheduler([solution.naked_twins] + strategies.ALL)
+        for grid in self.grids:
+            self.assertTrue(solution.solve(grid, topology=self.topology, strategies=scheduler))
+        report = scheduler.report()
+        self.assertEqual(list(report), ['naked_twins'] + [s.__name__ for s in strategies.ALL])
+        twins = report['naked_twins']
+        self.assertGreater(twins['calls'], 0)
+        self.assertLessEqual(twins['hits'], twins['calls'])
+        self.assertGreaterEqual(twins['removed'], twins['hits'])
+        # a later strategy only runs when every earlier one came up empty
+        self.assertLessEqual(report['naked_quads']['calls'], report['naked_twins']['calls'])
+
+    def test_cutoff_skips_fruitless_strategy(self):
+        calls = []
+
+        def never(values, topology=None):
+            calls.append(1)
+            return values
+
+        scheduler = StrategyScheduler([never], cutoffs={'never': 1})
+        fruitless = {}
+        values = self.topology.grid2values(self.grids[0])
+        self.assertEqual(scheduler.escalate(values, self.topology, fruitless), {})
+        self.assertEqual(scheduler.escalate(values, self.topology, fruitless), {})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(scheduler.stats['never'].calls, 1)
+
+    def test_list_and_scheduler_agree(self):
+        scheduler = StrategyScheduler([solution.naked_twins] + strategies.ALL)
+        for grid in self.grids:
+            values = self.topology.grid2values(grid)
+            expected = solution.reduce_puzzle(dict(values), self.topology, strategies.ALL)
+            self.assertEqual(solution.reduce_puzzle(dict(values), self.topology, scheduler), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import unittest
+
+import solution
+from server import SolverService
+from tests import test_solution
+
+
+class Client:
+    """A stand-in for a service consumer speaking the line protocol """
+
+    def __init__(self, address):
+        self.address = address
+
+    async def solve_all(self, lines):
+        reader, writer = await asyncio.open_connection(*self.address)
+        writer.write(''.join(line + '\n' for line in lines).encode())
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in lines]
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    async def http(self, request, half_close=False):
+        reader, writer = await asyncio.open_connection(*self.address)
+        writer.write(request.encode())
+        await writer.drain()
+        if half_close:
+            writer.write_eof()
+        head, _, body = (await reader.read()).partition(b'\r\n\r\n')
+        writer.close()
+        await writer.wait_closed()
+        return head.split(b'\r\n')[0].decode(), json.loads(body)
+
+
+class TestSolverService(unittest.IsolatedAsyncioTestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+    solved = solution.default_topology.values2grid(solution.solve(grid))
+
+    async def asyncSetUp(self):
+        self.service = SolverService(workers=1, max_delay=0.05)
+        self.client = Client(await self.service.start())
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def test_pipelined_requests_are_batched(self):
+        lines = [self.grid, json.dumps({'grid': '22' + '.' * 79, 'id': 'bad'}), 'xyz', '{"nope": 1}']
+        responses = await self.client.solve_all(lines)
+        self.assertEqual(responses[0]['solution'], self.solved)
+        self.assertEqual(responses[1]['id'], 'bad')
+        self.assertIsNone(responses[1]['solution'])
+        self.assertIsNone(responses[1]['error'])
+        self.assertIn('81', responses[2]['error'])
+        self.assertIsNone(responses[3]['solution'])
+        self.assertGreater(responses[0]['batch_size'], 1)
+        for response in responses[:3]:
+            self.assertGreaterEqual(response['latency_ms'], response['queue_ms'])
+
+    async def test_concurrent_clients(self):
+        results = await asyncio.gather(*[self.client.solve_all([self.grid]) for _ in range(5)])
+        self.assertTrue(all(responses[0]['solution'] == self.solved for responses in results))
+        metrics = self.service.metrics()
+        self.assertEqual(metrics['requests'], 5)
+        self.assertLessEqual(metrics['batches'], 5)
+        self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'])
+
+    async def test_http(self):
+        body = json.dumps({'grid': self.grid, 'id': 1})
+        status, response = await self.client.http(
+            'POST /solve HTTP/1.1\r\nContent-Length: {}\r\n\r\n{}'.format(len(body), body))
+        self.assertEqual(status, 'HTTP/1.1 200 OK')
+        self.assertEqual(response['solution'], self.solved)
+        self.assertEqual(response['id'], 1)
+        status, metrics = await self.client.http('GET /metrics HTTP/1.1\r\n\r\n')
+        self.assertEqual(metrics['requests'], 1)
+        status, _ = await self.client.http('GET /nowhere HTTP/1.1\r\n\r\n')
+        self.assertEqual(status, 'HTTP/1.1 404 Not Found')
+
+    async def test_invalid_characters(self):
+        lines = ['x' + '.' * 80, json.dumps({'grid': '0' + '.' * 80, 'id': 7})]
+        responses = await self.client.solve_all(lines)
+        for response in responses:
+            self.assertIsNone(response['solution'])
+            self.assertIn('digits', response['error'])
+        self.assertEqual(responses[1]['id'], 7)
+
+    async def test_overlong_line(self):
+        for lines in (['.' * 70000], [self.grid, '.' * 70000, self.grid]):
+            reader, writer = await asyncio.open_connection(*self.client.address)
+            writer.write(''.join(line + '\n' for line in lines).encode())
+            responses = [json.loads(line) for line in (await reader.read()).splitlines()]
+            writer.close()
+            await writer.wait_closed()
+            self.assertEqual(len(responses), lines.index('.' * 70000) + 1)
+            if len(lines) > 1:
+                self.assertEqual(responses[0]['solution'], self.solved)
+            self.assertIn('longer than', responses[-1]['error'])
+
+    def test_latency_window(self):
+        service = SolverService(window=3)
+        service.latencies.extend([5.0, 1.0, 2.0, 3.0])
+        self.assertEqual(service.metrics()['p99_ms'], 3000.0)
+
+    async def test_malformed_http(self):
+        for request, half_close in [('POST \r\n\r\n', False),
+                                    ('POST /solve HTTP/1.1\r\nContent-Length: many\r\n\r\n', False),
+                                    ('POST /solve HTTP/1.1\r\nContent-Length: -5\r\n\r\n', False),
+                                    ('POST /solve HTTP/1.1\r\nContent-Length: 81\r\n\r\n2...', True)]:
+            status, response = await self.client.http(request, half_close)
+            self.assertEqual(status, 'HTTP/1.1 400 Bad Request', request)
+            self.assertIn('bad request', response['error'])
+
+if __name__ == '__main__':
+    unittest.main()
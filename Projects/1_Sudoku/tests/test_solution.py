@@ -99,5 +99,111 @@ class TestDiagonalSudoku(unittest.TestCase):
     def test_solve(self):
         self.assertEqual(solution.solve(self.diagonal_grid), self.solved_diag_sudoku)
 
+class TestSearchInPlace(unittest.TestCase):
+    sparse_grid = '2......8..5...6.....1.2.......4...9.3...9...7..9..7....4...9...9.....7.....5....3'
+
+    def test_matches_copy_search(self):
+        for grid in (TestDiagonalSudoku.diagonal_grid, self.sparse_grid):
+            values = solution.grid2values(grid)
+            self.assertIs(solution.search(values, in_place=True), values)
+            self.assertEqual(values, solution.search(solution.grid2values(grid)))
+
+    def test_failure_restores_values(self):
+        grid = '22' + '.' * 79
+        values = solution.grid2values(grid)
+        self.assertFalse(solution.search(values, in_place=True))
+        self.assertEqual(values, solution.grid2values(grid))
+
+
+class TestCountSolutions(unittest.TestCase):
+
+    def test_counts(self):
+        sparse_grid = TestSearchInPlace.sparse_grid
+        self.assertEqual(solution.count_solutions(sparse_grid, limit=None), 77)
+        self.assertEqual(solution.count_solutions(sparse_grid), 2)
+        self.assertEqual(solution.count_solutions(sparse_grid, limit=10), 10)
+        self.assertEqual(solution.count_solutions('22' + '.' * 79), 0)
+
+    def test_is_unique(self):
+        self.assertTrue(solution.is_unique(TestDiagonalSudoku.diagonal_grid))
+        self.assertFalse(solution.is_unique(TestSearchInPlace.sparse_grid))
+        self.assertFalse(solution.is_unique('22' + '.' * 79))
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        # start from a clean trail, whatever earlier tests left behind
+        solution.history.disable()
+        solution.history.clear()
+
+    def tearDown(self):
+        solution.history.disable()
+        solution.history.clear()
+
+    def test_disabled_by_default(self):
+        solution.solve(TestDiagonalSudoku.diagonal_grid)
+        self.assertEqual(solution.history, [])
+
+    def test_replay(self):
+        for grid in (TestDiagonalSudoku.diagonal_grid, TestSearchInPlace.sparse_grid):
+            solution.history.enable()
+            result = solution.solve(grid)
+            values = solution.grid2values(grid)
+            for box, value in solution.reconstruct(result, solution.history):
+                values[box] = value
+            self.assertEqual(solution.values2grid(values), solution.values2grid(result))
+
+
+class TestReducePuzzle(unittest.TestCase):
+    diagonal_grid = TestDiagonalSudoku.diagonal_grid
+
+    @staticmethod
+    def sweep(values):
+        """Reference reduction: apply every strategy to every box until nothing changes """
+        while True:
+            before = dict(values)
+            solution.eliminate(values)
+            solution.only_choice(values)
+            solution.naked_twins(values)
+            if any(len(v) == 0 for v in values.values()):
+                return False
+            if values == before:
+                return values
+
+    def test_matches_full_sweeps(self):
+        solved = TestDiagonalSudoku.solved_diag_sudoku
+        for keep in ('', 'ABC', 'ACEGI', 'BDFH', 'ABCDEFGHI'):
+            grid = ''.join(solved[b] if b[0] in keep and b[1] in '13579' else g
+                           for b, g in zip(solution.boxes, self.diagonal_grid))
+            self.assertEqual(solution.reduce_puzzle(solution.grid2values(grid)),
+                             self.sweep(solution.grid2values(grid)))
+
+    @staticmethod
+    def until_stalled(values):
+        """Reference reduction: sweep every strategy until a pass solves no new box """
+        while True:
+            solved = sum(len(v) == 1 for v in values.values())
+            solution.eliminate(values)
+            solution.only_choice(values)
+            solution.naked_twins(values)
+            if any(len(v) == 0 for v in values.values()):
+                return False
+            if sum(len(v) == 1 for v in values.values()) == solved:
+                return values
+
+    def test_stronger_than_stalling(self):
+        # the stalling sweeps stop here while the strategies can still remove candidates
+        grid = '...83.....3.2.5.91.....9.8.7.31........36..7..6.....34......8.......8....29......'
+        stalled = self.until_stalled(solution.grid2values(grid))
+        reduced = solution.reduce_puzzle(solution.grid2values(grid))
+        self.assertEqual(reduced, self.sweep(solution.grid2values(grid)))
+        self.assertTrue(all(set(reduced[box]) <= set(stalled[box]) for box in solution.boxes))
+        self.assertNotEqual(reduced, stalled)
+
+    def test_unsolvable(self):
+        self.assertFalse(solution.reduce_puzzle(solution.grid2values('22' + '.' * 79)))
+
+
 if __name__ == '__main__':
     unittest.main()
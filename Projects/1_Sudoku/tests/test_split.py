@@ -0,0 +1,61 @@
+import multiprocessing
+import os
+import signal
+import threading
+import unittest
+
+import dlx
+import solution
+import split
+from corpus import iter_grids
+from tests import test_solution
+from topology import get_topology
+
+
+HARD_PUZZLES = os.path.join(os.path.dirname(__file__), 'puzzles', 'hard.txt')
+
+
+class TestSplitSearch(unittest.TestCase):
+    classic = get_topology(3, diagonal=False)
+
+    def test_expand(self):
+        grid = list(iter_grids(HARD_PUZZLES))[1]
+        solved, boards = split.expand(self.classic.grid2values(grid), self.classic, solution._scheduler((), self.classic), 8)
+        self.assertIsNone(solved)
+        self.assertGreaterEqual(len(boards), 8)
+        # the sub-boards partition the search space: exactly one holds the solution
+        expected = dlx.solve(grid, self.classic)
+        self.assertEqual(sum(all(expected[b] in board[b] for b in board) for board in boards), 1)
+
+    def test_solves_hard_puzzles(self):
+        for grid in list(iter_grids(HARD_PUZZLES))[:3]:
+            expected = dlx.solve(grid, self.classic)
+            self.assertEqual(split.solve(grid, self.classic, workers=2), expected)
+            self.assertEqual(split.solve(grid, self.classic, workers=1, boards=4), expected)
+
+    def test_backend(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(solution.solve(grid, backend='split'), solution.solve(grid))
+        self.assertFalse(solution.solve('22' + '.' * 79, backend='split'))
+        sparse = solution.solve(test_solution.TestSearchInPlace.sparse_grid, backend='split')
+        self.assertEqual(solution.count_solutions(solution.default_topology.values2grid(sparse)), 1)
+
+    def test_cancels_busy_workers(self):
+        # workers inherit a SIGTERM handler that ignores the signal, as with SDL;
+        # the pool must still shut down once a solution is found
+        grid = list(iter_grids(HARD_PUZZLES))[7]
+        results = []
+        previous = signal.signal(signal.SIGTERM, lambda signum, frame: None)
+        try:
+            worker = threading.Thread(target=lambda: results.append(
+                split.solve(grid, self.classic, workers=2, boards=8)), daemon=True)
+            worker.start()
+            worker.join(60)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        self.assertFalse(worker.is_alive(), 'split.solve did not return')
+        self.assertEqual(results, [dlx.solve(grid, self.classic)])
+        self.assertEqual(multiprocessing.active_children(), [])
+
+if __name__ == '__main__':
+    unittest.main()
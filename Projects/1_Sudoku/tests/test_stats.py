@@ -0,0 +1,58 @@
+import pickle
+import unittest
+
+import solution
+from batch import solve_many
+from stats import SolveStats, StatsCollector
+from tests import test_solution
+
+
+class TestSolveStats(unittest.TestCase):
+    sparse_grid = test_solution.TestSearchInPlace.sparse_grid
+
+    def test_default_result_is_unchanged(self):
+        result, stats = solution.solve(self.sparse_grid, stats=True)
+        self.assertEqual(result, solution.solve(self.sparse_grid))
+        self.assertIsInstance(stats, SolveStats)
+
+    def test_search_counters(self):
+        result, stats = solution.solve(self.sparse_grid, stats=True)
+        self.assertTrue(stats.solved)
+        self.assertGreater(stats.nodes, 0)
+        self.assertLessEqual(stats.backtracks, stats.nodes)
+        self.assertGreater(stats.max_depth, 0)
+        self.assertGreater(stats.passes, 0)
+        self.assertGreater(stats.eliminations['eliminate'], 0)
+        self.assertIn('naked_twins', stats.eliminations)
+        seconds = stats.seconds
+        self.assertAlmostEqual(seconds['parse'] + seconds['propagate'] + seconds['search'], seconds['total'])
+
+    def test_other_backends_report_time(self):
+        result, stats = solution.solve(self.sparse_grid, backend='dlx', stats=True)
+        self.assertTrue(stats.solved)
+        self.assertGreater(stats.seconds['total'], 0)
+
+    def test_pickle(self):
+        result, stats = solution.solve(self.sparse_grid, stats=True)
+        self.assertEqual(pickle.loads(pickle.dumps(stats)).as_dict(), stats.as_dict())
+
+
+class TestStatsCollector(unittest.TestCase):
+    grids = [test_solution.TestDiagonalSudoku.diagonal_grid,
+             test_solution.TestSearchInPlace.sparse_grid, '22' + '.' * 79]
+
+    def test_solve_many(self):
+        collector = StatsCollector()
+        results = solve_many(self.grids * 2, workers=2, collector=collector)
+        self.assertEqual(results, [solution.solve(grid) for grid in self.grids * 2])
+        summary = collector.summary()
+        self.assertEqual(summary['puzzles'], 6)
+        self.assertEqual(summary['solved'], 4)
+        single = [solution.solve(grid, stats=True)[1] for grid in self.grids * 2]
+        self.assertEqual(summary['nodes'], sum(stats.nodes for stats in single))
+        self.assertEqual(summary['max_depth'], max(stats.max_depth for stats in single))
+        self.assertLessEqual(summary['p50'], summary['p99'])
+
+
+if __name__ == '__main__':
+    unittest.main()
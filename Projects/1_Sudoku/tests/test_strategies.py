@@ -0,0 +1,50 @@
+import os
+import unittest
+
+import dlx
+import solution
+import strategies
+from corpus import iter_grids
+from topology import get_topology
+
+
+HARD_PUZZLES = os.path.join(os.path.dirname(__file__), 'puzzles', 'hard.txt')
+
+
+class TestStrategies(unittest.TestCase):
+    """The hard puzzles are classic (non-diagonal) Sudoku with unique solutions """
+    topology = get_topology(3, diagonal=False)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.puzzles = []
+        for grid in iter_grids(HARD_PUZZLES):
+            reduced = solution.reduce_puzzle(cls.topology.grid2values(grid), cls.topology)
+            cls.puzzles.append((reduced, dlx.solve(grid, cls.topology)))
+
+    def test_strategies_are_sound(self):
+        for strategy in strategies.ALL:
+            for reduced, solved in self.puzzles:
+                values = strategy(dict(reduced), self.topology)
+                for box in self.topology.boxes:
+                    self.assertIn(solved[box], values[box], strategy.__name__)
+
+    def test_strategies_make_progress(self):
+        for strategy in strategies.ALL:
+            progress = [strategy(dict(reduced), self.topology) != reduced for reduced, _ in self.puzzles]
+            self.assertTrue(any(progress), strategy.__name__)
+
+    def test_reduce_puzzle_with_strategies(self):
+        for reduced, solved in self.puzzles:
+            values = solution.reduce_puzzle(dict(reduced), self.topology, strategies.ALL)
+            self.assertLessEqual(sum(map(len, values.values())), sum(map(len, reduced.values())))
+            self.assertTrue(all(solved[box] in values[box] for box in self.topology.boxes))
+
+    def test_solve_with_strategies(self):
+        for grid in iter_grids(HARD_PUZZLES):
+            self.assertEqual(solution.solve(grid, topology=self.topology, strategies=strategies.ALL),
+                             dlx.solve(grid, self.topology))
+
+
+if __name__ == '__main__':
+    unittest.main()
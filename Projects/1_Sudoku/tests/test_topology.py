@@ -0,0 +1,70 @@
+import pickle
+import random
+import unittest
+
+import solution
+from topology import Topology, get_topology
+
+
+def pattern_grid(topology, clues, seed=0):
+    """A valid (non-diagonal) puzzle built from the standard shifted-row pattern """
+    n, b = topology.size, topology.box_size
+    digits = topology.digits
+    full = [digits[(b * (r % b) + r // b + c) % n] for r in range(n) for c in range(n)]
+    keep = set(random.Random(seed).sample(range(n * n), clues))
+    return ''.join(d if i in keep else '.' for i, d in enumerate(full))
+
+
+class TestTopology(unittest.TestCase):
+
+    def assertSolved(self, values, topology):
+        for unit in topology.unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), sorted(topology.digits))
+
+    def test_default_board(self):
+        topology = get_topology()
+        self.assertIs(topology, solution.default_topology)
+        self.assertEqual(len(topology.unitlist), 29)
+        self.assertEqual(len(topology.peers['A1']), 26)
+        self.assertEqual(len(topology.peers['A2']), 20)
+        self.assertEqual(topology.boxes, solution.boxes)
+
+    def test_tables(self):
+        topology = get_topology(4, diagonal=False)
+        self.assertEqual(len(topology.boxes), 256)
+        self.assertEqual(len(topology.unitlist), 48)
+        for box in ('A1', 'P16', 'G10'):
+            self.assertEqual(len(topology.peers[box]), 39)
+            i = topology.index[box]
+            self.assertEqual(set(topology.peer_index[i]), {topology.index[p] for p in topology.peers[box]})
+        self.assertIs(pickle.loads(pickle.dumps(topology)), topology)
+
+    def test_solve_4x4_diagonal(self):
+        topology = get_topology(2, diagonal=True)
+        values = solution.solve('.' * 16, topology=topology)
+        self.assertSolved(values, topology)
+
+    def test_solve_large_boards(self):
+        for box_size, clues in ((4, 140), (5, 400)):
+            topology = get_topology(box_size, diagonal=False)
+            grid = pattern_grid(topology, clues)
+            values = solution.solve(grid, topology=topology)
+            self.assertSolved(values, topology)
+            for box, given in zip(topology.boxes, grid):
+                if given != '.':
+                    self.assertEqual(values[box], given)
+
+    def test_invalid_box_size(self):
+        with self.assertRaises(ValueError):
+            Topology(6)
+
+    def test_invalid_grid(self):
+        for grid in ('x' + '.' * 80, '0' * 81, 'G' + '.' * 80):
+            for backend in ('dict', 'bitmask', 'dlx', 'split'):
+                with self.assertRaisesRegex(ValueError, 'digits', msg=backend):
+                    solution.solve(grid, backend=backend)
+        self.assertTrue(solution.solve('G' + '.' * 255, topology=get_topology(4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
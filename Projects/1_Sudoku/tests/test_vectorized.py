@@ -0,0 +1,53 @@
+import random
+import unittest
+
+import numpy as np
+
+import solution
+import vectorized
+from utils import boxes
+from tests import test_solution
+
+
+class TestVectorized(unittest.TestCase):
+    solved = test_solution.TestDiagonalSudoku.solved_diag_sudoku
+
+    def puzzles(self, count, clues, seed=0):
+        rng = random.Random(seed)
+        grids = []
+        for _ in range(count):
+            keep = set(rng.sample(boxes, clues))
+            grids.append(''.join(self.solved[b] if b in keep else '.' for b in boxes))
+        return grids
+
+    def test_round_trip(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        cands = vectorized.grids2array([grid])
+        self.assertEqual(cands.shape, (1, 81, 9))
+        self.assertEqual(vectorized.array2values(cands[0]), solution.grid2values(grid))
+
+    def test_propagate_matches_reduction(self):
+        # without naked twins the batch fixpoint can only hold more candidates
+        for grid in self.puzzles(20, 30):
+            cands = vectorized.grids2array([grid])
+            self.assertFalse(vectorized.propagate(cands)[0])
+            reduced = solution.reduce_puzzle(solution.grid2values(grid))
+            for box, digits in vectorized.array2values(cands[0]).items():
+                self.assertTrue(set(reduced[box]) <= set(digits))
+
+    def test_solve_batch(self):
+        grids = [test_solution.TestDiagonalSudoku.diagonal_grid, '22' + '.' * 79] + self.puzzles(10, 40)
+        results = vectorized.solve_batch(grids)
+        self.assertEqual(results[0], self.solved)
+        self.assertFalse(results[1])
+        for result in results[2:]:
+            self.assertEqual(result, self.solved)
+
+    def test_dead_puzzle(self):
+        cands = vectorized.grids2array(['1' + '.' * 79 + '1'])
+        self.assertTrue(vectorized.propagate(cands)[0])
+        self.assertTrue(np.all(cands.sum(axis=2) <= 9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Board topologies for square Sudoku puzzles of any box size.
+
+A `Topology` describes the boxes, units and peers of an N x N board made of
+sqrt(N) x sqrt(N) squares, optionally with the two main diagonals as extra units
+and with variant constraints from constraints.py (extra regions, extra peers and
+constraint-specific propagators). Every table is built once when the topology
+is created, and `get_topology` caches topologies so that each shape is only
+ever built once per process.
+"""
+from functools import lru_cache
+
+from utils import cross, extract_units, extract_peers
+
+
+ROW_LABELS = 'ABCDEFGHIJKLMNOPQRSTUVWXY'
+SYMBOLS = '123456789ABCDEFGHIJKLMNOP'
+
+
+class Topology:
+    """The boxes, units and peers of an N x N Sudoku board
+
+    Parameters
+    ----------
+    box_size(int)
+        the side length of each square; the board has box_size ** 2 rows,
+        columns, squares and digits (2 through 5, e.g. 3 for a 9x9 board)
+
+    diagonal(bool)
+        if True, the two main diagonals are added as units
+
+    constraints(tuple)
+        constraint plugins (see constraints.py) that add units, peers and
+        strategies to the board
+
+    Attributes
+    ----------
+    digits(string)
+        the symbol for each digit, e.g. '123456789' or '123456789ABCDEFG'
+
+    boxes(list)
+        box names in row-major order, e.g. ['A1', 'A2', ..., 'P16']
+
+    unitlist(list)
+        every unit as a list of box names: rows, then columns, squares and diagonals
+
+    units, peers(dict)
+        the member units and the set of peers of each box
+
+    strategies(list)
+        the propagators of the constraint plugins, which the solver runs before
+        any other strategy once eliminate and only choice stall
+
+    unit_ids(dict)
+        the indexes into `unitlist` of the member units of each box
+
+    index(dict)
+        the position of each box in `boxes`
+
+    unit_index, peer_index(tuple)
+        the units and the peers of each box as tuples of positions in `boxes`
+    """
+    def __init__(self, box_size=3, diagonal=True, constraints=()):
+        if not 2 <= box_size <= 5:
+            raise ValueError("box_size must be between 2 and 5, got {}".format(box_size))
+        size = box_size * box_size
+        self.box_size = box_size
+        self.size = size
+        self.diagonal = diagonal
+        self.constraints = tuple(constraints)
+        self.digits = SYMBOLS[:size]
+        self.rows = ROW_LABELS[:size]
+        self.cols = [str(c) for c in range(1, size + 1)]
+        self.boxes = cross(self.rows, self.cols)
+
+        row_bands = [self.rows[i:i + box_size] for i in range(0, size, box_size)]
+        col_bands = [self.cols[i:i + box_size] for i in range(0, size, box_size)]
+        self.row_units = [cross(r, self.cols) for r in self.rows]
+        self.column_units = [cross(self.rows, [c]) for c in self.cols]
+        self.square_units = [cross(rs, cs) for rs in row_bands for cs in col_bands]
+        self.diagonal_units = []
+        if diagonal:
+            self.diagonal_units = [[r + c for r, c in zip(self.rows, self.cols)],
+                                   [r + c for r, c in zip(self.rows, self.cols[::-1])]]
+        self.unitlist = self.row_units + self.column_units + self.square_units + self.diagonal_units
+        for constraint in self.constraints:
+            self.unitlist = self.unitlist + constraint.units(self)
+
+        self.units = extract_units(self.unitlist, self.boxes)
+        self.peers = extract_peers(self.units, self.boxes)
+        for constraint in self.constraints:
+            for box, others in constraint.peers(self).items():
+                for other in others:
+                    if other != box:
+                        self.peers[box].add(other)
+                        self.peers[other].add(box)
+        self.strategies = [s for constraint in self.constraints for s in constraint.strategies(self)]
+        self.unit_ids = {box: [] for box in self.boxes}
+        for i, unit in enumerate(self.unitlist):
+            for box in unit:
+                self.unit_ids[box].append(i)
+
+        self.index = {box: i for i, box in enumerate(self.boxes)}
+        self.unit_index = tuple(tuple(self.index[box] for box in unit) for unit in self.unitlist)
+        self.peer_index = tuple(tuple(sorted(self.index[peer] for peer in self.peers[box]))
+                                for box in self.boxes)
+
+    def __repr__(self):
+        if self.constraints:
+            return 'Topology(box_size={}, diagonal={}, constraints={!r})'.format(
+                self.box_size, self.diagonal, self.constraints)
+        return 'Topology(box_size={}, diagonal={})'.format(self.box_size, self.diagonal)
+
+    def __reduce__(self):
+        # unpickle through the cache so worker processes share one instance per shape
+        return get_topology, (self.box_size, self.diagonal, self.constraints)
+
+    def check_grid(self, grid):
+        """Raise ValueError unless `grid` is a grid string of this topology """
+        if len(grid) != len(self.boxes):
+            raise ValueError("expected a {}-character grid, got {} characters".format(len(self.boxes), len(grid)))
+        if not set(grid) <= set(self.digits + '.'):
+            raise ValueError('a grid may only contain the digits {} and "."'.format(self.digits))
+
+    def grid2values(self, grid):
+        """Convert a grid string into a dict of {box: candidates}, with every digit for '.' boxes """
+        self.check_grid(grid)
+        return {box: self.digits if val == '.' else val for val, box in zip(grid, self.boxes)}
+
+    def values2grid(self, values):
+        """Convert the dictionary board representation to a grid string, with '.' for unsolved boxes """
+        return ''.join(values[box] if len(values[box]) == 1 else '.' for box in self.boxes)
+
+
+def get_topology(box_size=3, diagonal=True, constraints=()):
+    """Return the (cached) `Topology` for the given box size and constraint plugins """
+    return _cached_topology(box_size, bool(diagonal), tuple(constraints))
+
+
+@lru_cache()
+def _cached_topology(box_size, diagonal, constraints):
+    return Topology(box_size, diagonal, constraints)
@@ -5,7 +5,26 @@ from collections import defaultdict
 rows = 'ABCDEFGHI'
 cols = '123456789'
 boxes = [r + c for r in rows for c in cols]
-history = {}  # history must be declared here so that it exists in the assign_values scope
+
+
+class History(list):
+    """An append-only trail of (box, value) assignment events
+
+    Recording is off by default, so that nothing is stored (or paid for) in
+    production; call `enable()` before solving to record a trail for `reconstruct`.
+    """
+    enabled = False
+
+    def enable(self):
+        """Start recording, discarding any earlier events """
+        self.clear()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+
+history = History()  # history must be declared here so that it exists in the assign_values scope
 
 
 def extract_units(unitlist, boxes):
@@ -27,11 +46,11 @@ def extract_units(unitlist, boxes):
     """
     # the value for keys that aren't in the dictionary are initialized as an empty list
     units = defaultdict(list)
-    for current_box in boxes:
-        for unit in unitlist:
-            if current_box in unit:
-                # defaultdict avoids this raising a KeyError when new keys are added
-                units[current_box].append(unit)
+    # a single pass over the units keeps each box's units in unitlist order
+    for unit in unitlist:
+        for current_box in unit:
+            # defaultdict avoids this raising a KeyError when new keys are added
+            units[current_box].append(unit)
     return units
 
 
@@ -85,10 +104,9 @@ def assign_value(values, box, value):
     if values[box] == value:
         return values
 
-    prev = values2grid(values)
     values[box] = value
-    if len(value) == 1:
-        history[values2grid(values)] = (prev, (box, value))
+    if history.enabled and len(value) == 1:
+        history.append((box, value))
     return values
 
 def cross(A, B):
@@ -168,10 +186,9 @@ def reconstruct(values, history):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
-    history(dict)
-        a dictionary of the form {key: (key, (box, value))} encoding a linked
-        list where each element points to the parent and identifies the value
-        assignment that connects from the parent to the current state
+    history(list)
+        a trail of (box, value) events in the order the assignments were made,
+        including assignments that were later undone by backtracking
 
     Returns
     -------
@@ -179,9 +196,9 @@ def reconstruct(values, history):
         a list of (box, value) assignments that can be applied in order to the
         starting Sudoku puzzle to reach the solution
     """
-    path = []
-    prev = values2grid(values)
-    while prev in history:
-        prev, step = history[prev]
-        path.append(step)
-    return path[::-1]
+    # keep the last assignment of each box that survived into the final values
+    last = {}
+    for i, (box, value) in enumerate(history):
+        if values[box] == value:
+            last[box] = i
+    return [history[i] for i in sorted(last.values())]
@@ -0,0 +1,176 @@
+"""Vectorized constraint propagation over a batch of Sudoku puzzles with NumPy.
+
+A batch is a boolean array of shape (N, boxes, digits), where ``cands[n, b, d]``
+is True while digit ``d`` is still a candidate for box ``b`` of puzzle ``n``.
+Elimination and hidden singles (the only choice strategy) run for the whole
+batch with matrix products over the unit and peer structure of the topology.
+Only puzzles that propagation alone cannot finish fall back to `solution.search`.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from solution import default_topology, search
+
+
+@lru_cache()
+def _tables(topology):
+    """Precompute the incidence matrices used by `propagate`
+
+    Returns
+    -------
+    tuple
+        (units, peers, members) where units is a (U, n) array with the box
+        positions of every unit, peers is a (B, B) float matrix with a 1 for every
+        pair of peers, and members is a (B, U * n) float matrix mapping each
+        (unit, position in unit) slot back to its box
+    """
+    units = np.array(topology.unit_index, dtype=np.intp)
+    n_boxes = len(topology.boxes)
+    peers = np.zeros((n_boxes, n_boxes), dtype=np.float32)
+    for b, others in enumerate(topology.peer_index):
+        peers[b, list(others)] = 1
+    members = np.zeros((n_boxes, units.size), dtype=np.float32)
+    members[units.ravel(), np.arange(units.size)] = 1
+    return units, peers, members
+
+
+def grids2array(grids, topology=None):
+    """Convert grid strings into a candidate array
+
+    Parameters
+    ----------
+    grids(list)
+        strings representing sudoku grids
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    Returns
+    -------
+    numpy.ndarray
+        a boolean array of shape (len(grids), boxes, digits)
+    """
+    topology = topology or default_topology
+    n_boxes, n_digits = len(topology.boxes), len(topology.digits)
+    if any(len(grid) != n_boxes for grid in grids):
+        raise ValueError("every grid must have {} characters".format(n_boxes))
+    codes = np.frombuffer(''.join(grids).encode('ascii'), dtype=np.uint8).reshape(len(grids), n_boxes)
+    lookup = np.full(256, -1, dtype=np.intp)
+    lookup[[ord(d) for d in topology.digits]] = np.arange(n_digits)
+    digit = lookup[codes]
+    cands = np.ones((len(grids), n_boxes, n_digits), dtype=bool)
+    given = digit >= 0
+    cands[given] = np.eye(n_digits, dtype=bool)[digit[given]]
+    return cands
+
+
+def array2values(cands, topology=None):
+    """Convert one puzzle of a candidate array to the dictionary representation
+
+    Parameters
+    ----------
+    cands(numpy.ndarray)
+        a boolean array of shape (boxes, digits)
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    Returns
+    -------
+    dict
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    topology = topology or default_topology
+    digits = np.array(list(topology.digits))
+    return {box: ''.join(digits[row]) for box, row in zip(topology.boxes, cands)}
+
+
+def propagate(cands, topology=None):
+    """Apply elimination and hidden singles to every puzzle in a batch until
+    none of them change any more
+
+    Parameters
+    ----------
+    cands(numpy.ndarray)
+        a boolean array of shape (N, boxes, digits); it is updated in place
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    Returns
+    -------
+    numpy.ndarray
+        a boolean array of shape (N,) that is True for every puzzle found to
+        have no solution
+    """
+    units, peers, members = _tables(topology or default_topology)
+    n_puzzles, n_boxes, n_digits = cands.shape
+    dead = np.zeros(n_puzzles, dtype=bool)
+    active = np.arange(n_puzzles)
+    while active.size:
+        batch = cands[active]
+        before = batch.copy()
+
+        # eliminate: drop the digit of every solved box from its peers
+        solved = batch & (batch.sum(axis=2) == 1)[:, :, None]
+        batch &= ~(np.matmul(peers, solved.astype(np.float32)) > 0)
+
+        # only choice: a digit with a single place in a unit goes in that box
+        slots = batch[:, units, :]                              # (N, U, n, D)
+        counts = slots.sum(axis=2)                              # (N, U, D)
+        singles = slots & (counts == 1)[:, :, None, :]
+        hidden = np.matmul(members, singles.reshape(len(active), -1, n_digits).astype(np.float32)) > 0
+        n_hidden = hidden.sum(axis=2)
+        batch = np.where((n_hidden > 0)[:, :, None], hidden, batch)
+
+        failed = ((batch.sum(axis=2) == 0).any(axis=1) | (n_hidden > 1).any(axis=1) |
+                  (batch[:, units, :].sum(axis=2) == 0).any(axis=(1, 2)))
+        cands[active] = batch
+        dead[active[failed]] = True
+        changed = (batch != before).any(axis=(1, 2)) & ~failed
+        active = active[changed]
+    return dead
+
+
+def solve_batch(grids, topology=None):
+    """Solve a batch of Sudoku puzzles, propagating all of them at once and
+    searching only the ones that propagation leaves unsolved
+
+    Parameters
+    ----------
+    grids(list)
+        strings representing sudoku grids
+
+    topology(Topology)
+        the board shape (defaults to the diagonal 9x9 board)
+
+    Returns
+    -------
+    list
+        the dictionary representation of each solved grid, or False for the
+        puzzles with no solution, in input order
+    """
+    topology = topology or default_topology
+    grids = list(grids)
+    if not grids:
+        return []
+    cands = grids2array(grids, topology)
+    dead = propagate(cands, topology)
+    n_cands = cands.sum(axis=2)
+    # propagation here knows nothing of the constraint propagators (like cage
+    # sums), so with those every puzzle goes through search to be checked
+    solved = (n_cands == 1).all(axis=1) & (not topology.strategies)
+    digits = np.array(list(topology.digits))
+    finished = digits[cands.argmax(axis=2)]
+
+    results = []
+    for n in range(len(grids)):
+        if dead[n]:
+            results.append(False)
+        elif solved[n]:
+            results.append(dict(zip(topology.boxes, finished[n].tolist())))
+        else:
+            values = array2values(cands[n], topology)
+            results.append(search(values, in_place=True, topology=topology))
+    return results
@@ -159,3 +159,28 @@ def decode_state(state, fluent_map):
         else:
             fs.neg.append(fluent_map[idx])
     return fs
+
+
+def encode_bits(state):
+    """ Pack an ordered sequence of True/False values into an int, most
+    significant bit first: state[0] is the highest of len(state) bits (see
+    encode_state)
+
+    Planning problems represent their search states as these bitsets, so that
+    testing preconditions, applying effects and testing the goal each take a
+    few integer operations. Packing the first value into the highest bit makes
+    the bitsets compare like the tuples they encode, so searches that break
+    ties on the state expand nodes in the same order.
+    """
+    bits = 0
+    for elem in state:
+        bits = bits << 1 | bool(elem)
+    return bits
+
+
+def decode_bits(bits, fluent_map):
+    """ Unpack a state bitset into an ordered tuple of True/False values, one
+    for each fluent in fluent_map (the inverse of encode_bits)
+    """
+    top = len(fluent_map) - 1
+    return tuple([bool(bits >> (top - idx) & 1) for idx in range(len(fluent_map))])
@@ -1,8 +1,11 @@
 
 from copy import deepcopy
 from functools import lru_cache
-from itertools import combinations
-from collections import defaultdict, MutableSet
+from itertools import chain
+from collections import defaultdict
+from collections.abc import MutableSet
+
+import numpy as np
 
 from aimacode.planning import Action
 from aimacode.utils import expr, Expr
@@ -84,6 +87,13 @@ class BaseLayer(MutableSet):
     that stores actions or literals as a mutable set (which enables terse,
     efficient membership testing and expansion)
 
+    Items are numbered in the order they are added to a layer, and a layer made
+    from another layer keeps its numbering, so that an item keeps its number
+    from one level of the planning graph to the next. Membership is a bitset
+    over the item numbers, and the mutex relation is a bit matrix over them,
+    which lets update_mutexes() find every mutex pair of a layer at once with
+    boolean matrix products instead of testing the pairs one by one.
+
     Attributes
     ----------
     parents : dict
@@ -104,11 +114,18 @@ class BaseLayer(MutableSet):
         parent. (This ensures that parent_layer.is_mutex() is always defined for
         real layers in the planning graph) Action layers always have a literal layer
         as parent, and literal layers always have an action layer as parent.
-    
-    _mutexes : dict
-        Mapping from each item (action or literal) to a set containing all items
-        that are mutex to the key. E.g., _mutexes[literaA] is a set of literals
-        that are mutex to literalA in this level of the planning graph
+
+    _index : dict
+        Mapping from each item to its number; items passed to set_mutex() are
+        numbered too, even if they are not in the layer
+
+    _members : int
+        Bitset of the numbers of the items in the layer
+
+    _mutex_bits : numpy.ndarray
+        The mutex relation as a bit matrix with rows packed by np.packbits: bit
+        j of row i is set when the items numbered i and j are mutex in this level
+        of the planning graph
 
     _ignore_mutexes : bool
         If _ignore_mutexes is True then _dynamic_ mutexes will be ignored (static
@@ -129,42 +146,127 @@ class BaseLayer(MutableSet):
             See _ignore_mutexes attribute
         """
         super().__init__()
-        self.__store = set(iter(items))
+        self._mutex_bits = np.zeros((0, 0), np.uint8)
+        if isinstance(items, BaseLayer):
+            self._index = dict(items._index)
+            self._items = list(items._items)
+            self._members = items._members
+            self._size = items._size
+        else:
+            self._index = {}
+            self._items = []
+            self._members = self._size = 0
+            for item in items:
+                self.add(item)
         self.parents = defaultdict(set)
         self.children = defaultdict(set)
-        self._mutexes = defaultdict(set)
         self.parent_layer = parent_layer
         self._ignore_mutexes = ignore_mutexes
 
     def __contains__(self, item):
-        return item in self.__store
+        idx = self._index.get(item)
+        return idx is not None and bool(self._members >> idx & 1)
 
     def __iter__(self):
-        return iter(self.__store)
+        if self._size == len(self._items):
+            return iter(list(self._items))
+        flags = bin(self._members)[:1:-1]
+        return iter([item for item, flag in zip(self._items, flags) if flag == '1'])
 
     def __len__(self):
-        return len(self.__store)
+        return self._size
 
     def __eq__(self, other):
-        return (len(self) == len(other) and
-            len(self._mutexes) == len(other._mutexes) and
-            0 == len(self ^ other) and self._mutexes == other._mutexes)
+        return (len(self) == len(other) and set(self) == set(other)
+            and self._mutex_pairs() == other._mutex_pairs())
 
     def add(self, item):
-        self.__store.add(item)
+        bit = 1 << self._number(item)
+        if not self._members & bit:
+            self._members |= bit
+            self._size += 1
 
     def discard(self, item):
-        try:
-            self.__store.discard(item)
-        except ValueError:
-            pass
+        idx = self._index.get(item)
+        if idx is not None and self._members >> idx & 1:
+            self._members ^= 1 << idx
+            self._size -= 1
 
     def set_mutex(self, itemA, itemB):
-        self._mutexes[itemA].add(itemB)
-        self._mutexes[itemB].add(itemA)
+        a, b = self._number(itemA), self._number(itemB)
+        self._reserve(len(self._items))
+        self._mutex_bits[a, b >> 3] |= 0x80 >> (b & 7)
+        self._mutex_bits[b, a >> 3] |= 0x80 >> (a & 7)
 
     def is_mutex(self, itemA, itemB):
-        return itemA in self._mutexes.get(itemB, [])
+        a, b = self._index.get(itemA), self._index.get(itemB)
+        if a is None or b is None or max(a, b) >= len(self._mutex_bits):
+            return False
+        return bool(self._mutex_bits[a, b >> 3] & (0x80 >> (b & 7)))
+
+    def mutex_count(self):
+        """ The number of mutex pairs in the layer """
+        return int(np.unpackbits(self._mutex_bits).sum()) // 2
+
+    def _number(self, item):
+        idx = self._index.get(item)
+        if idx is None:
+            idx = self._index[item] = len(self._items)
+            self._items.append(item)
+        return idx
+
+    def _reserve(self, count):
+        """ Grow the mutex bit matrix to hold at least `count` item numbers """
+        rows = len(self._mutex_bits)
+        if count > rows:
+            size = max(count, 2 * rows, 8)
+            grown = np.zeros((size, (size + 7) // 8), np.uint8)
+            grown[:rows, :self._mutex_bits.shape[1]] = self._mutex_bits
+            self._mutex_bits = grown
+
+    def _mutex_matrix(self):
+        """ The mutex relation as a square boolean matrix over the item numbers """
+        count = len(self._items)
+        self._reserve(count)
+        return np.unpackbits(self._mutex_bits[:count], axis=1, count=count).view(bool)
+
+    def _add_mutexes(self, mutexes):
+        """ Set the mutexes in a square boolean matrix over the item numbers,
+        ignoring the diagonal and the items that are not in the layer """
+        count = len(self._items)
+        members = np.unpackbits(np.frombuffer(self._members.to_bytes((count + 7) // 8, 'little'), np.uint8),
+                                count=count, bitorder='little').view(bool)
+        mutexes &= np.outer(members, members)
+        np.fill_diagonal(mutexes, False)
+        self._reserve(count)
+        packed = np.packbits(mutexes, axis=1)
+        self._mutex_bits[:count, :packed.shape[1]] |= packed
+
+    def _mutex_pairs(self):
+        rows, cols = np.nonzero(np.triu(self._mutex_matrix()))
+        return {frozenset((self._items[a], self._items[b])) for a, b in zip(rows, cols)}
+
+
+def _incidence(collections, index):
+    """ Boolean matrix with a row for each collection, which is True in the
+    columns index[x] of the items x of the collection that are in `index` """
+    matrix = np.zeros((len(collections), len(index)), bool)
+    rows, cols = [], []
+    for row, collection in enumerate(collections):
+        for item in collection:
+            col = index.get(item)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    matrix[rows, cols] = True
+    return matrix
+
+
+def _meets(a, b):
+    """ For boolean matrices a and b with the same number of columns, the boolean
+    matrix that is True in [i, j] when rows a[i] and b[j] are both True in some column
+    """
+    return (a.astype(np.float32) @ b.T.astype(np.float32)) > 0
 
 
 class BaseActionLayer(BaseLayer):
@@ -176,16 +278,38 @@ class BaseActionLayer(BaseLayer):
             self.children.update({k: set(v) for k, v in actions.children.items()})
 
     def update_mutexes(self):
-        for actionA, actionB in combinations(iter(self), 2):
-            if self._serialize and actionA.no_op == actionB.no_op == False:
-                self.set_mutex(actionA, actionB)
-            elif (self._inconsistent_effects(actionA, actionB)
-                    or self._interference(actionA, actionB)):
-                self.set_mutex(actionA, actionB)
-            elif self._ignore_mutexes:
-                continue
-            elif self._competing_needs(actionA, actionB):
-                self.set_mutex(actionA, actionB)
+        """ Set the mutexes between every pair of actions in the layer
+
+        The relations are the ones tested pair by pair by _inconsistent_effects,
+        _interference and _competing_needs, computed for all pairs at once:
+        with the actions as rows of boolean matrices over the literals they
+        need and produce, two actions are related when their rows meet (see _meets).
+        """
+        actions = self._items
+        literals = {}
+        for action in actions:
+            for literal in chain(action.preconditions, action.effects):
+                literals.setdefault(literal, len(literals))
+        preconditions = _incidence([a.preconditions for a in actions], literals)
+        effects = _incidence([a.effects for a in actions], literals)
+        # the negated effects of an action: the column of each effect moved to its negation
+        pairs = [(col, literals[~literal]) for literal, col in literals.items() if ~literal in literals]
+        negated = np.zeros_like(effects)
+        if pairs:
+            cols, negations = zip(*pairs)
+            negated[:, list(negations)] = effects[:, list(cols)]
+
+        mutexes = _meets(negated, effects)                  # inconsistent effects
+        interference = _meets(negated, preconditions)
+        mutexes |= interference | interference.T
+        if self._serialize:
+            real = np.array([not a.no_op for a in actions], bool)
+            mutexes |= np.outer(real, real)
+        if not self._ignore_mutexes and self.parent_layer is not None:
+            # competing needs: a precondition of one is mutex with a precondition of the other
+            needs = _incidence([a.preconditions for a in actions], self.parent_layer._index)
+            mutexes |= _meets(_meets(needs, self.parent_layer._mutex_matrix()), needs)
+        self._add_mutexes(mutexes)
 
     def add_inbound_edges(self, action, literals):
         # inbound action edges are many-to-one
@@ -204,13 +328,24 @@ class BaseLiteralLayer(BaseLayer):
             self.children.update({k: set(v) for k, v in literals.children.items()})
 
     def update_mutexes(self):
-        for literalA, literalB in combinations(iter(self), 2):
-            if self._negation(literalA, literalB):
-                self.set_mutex(literalA, literalB)
-            elif self._ignore_mutexes:
-                continue
-            elif len(self.parent_layer) and self._inconsistent_support(literalA, literalB):
-                self.set_mutex(literalA, literalB)
+        """ Set the mutexes between every pair of literals in the layer
+
+        The relations are the ones tested pair by pair by _negation and
+        _inconsistent_support; two literals have consistent support when a
+        row of the actions that produce one meets, in the non-mutex matrix of
+        the parent layer, the row of the actions that produce the other.
+        """
+        literals = self._items
+        mutexes = np.zeros((len(literals), len(literals)), bool)
+        for literal, idx in self._index.items():
+            negation = self._index.get(~literal)
+            if negation is not None:
+                mutexes[idx, negation] = True
+        if not self._ignore_mutexes and len(self.parent_layer):
+            support = _incidence([self.parents.get(l, ()) for l in literals], self.parent_layer._index)
+            compatible = ~self.parent_layer._mutex_matrix()
+            mutexes |= ~_meets(_meets(support, compatible), support)
+        self._add_mutexes(mutexes)
 
     def add_inbound_edges(self, action, literals):
         # inbound literal edges are many-to-many
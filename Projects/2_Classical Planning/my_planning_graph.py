@@ -1,8 +1,10 @@
 
+from collections import defaultdict
 from itertools import chain, combinations
 from aimacode.planning import Action
 from aimacode.utils import expr
 
+from _utils import decode_bits
 from layers import BaseActionLayer, BaseLiteralLayer, makeNoOp, make_node
 
 class ActionLayer(BaseActionLayer):
@@ -131,9 +133,10 @@ class PlanningGraph:
         problem : PlanningProblem
             An instance of the PlanningProblem class
 
-        state : tuple(bool)
-            An ordered sequence of True/False values indicating the literal value
-            of the corresponding fluent in problem.state_map
+        state : int or tuple(bool)
+            A state bitset (see _utils.encode_bits) or an ordered sequence of
+            True/False values indicating the literal value of the corresponding
+            fluent in problem.state_map
 
         serialize : bool
             Flag indicating whether to serialize non-persistence actions. Actions
@@ -152,11 +155,24 @@ class PlanningGraph:
         
         # initialize the planning graph by finding the literals that are in the
         # first layer and finding the actions they they should be connected to
+        if isinstance(state, int):
+            state = decode_bits(state, problem.state_map)
         literals = [s if f else ~s for f, s in zip(state, problem.state_map)]
         layer = LiteralLayer(literals, ActionLayer(), self._ignore_mutexes)
         layer.update_mutexes()
         self.literal_layers = [layer]
         self.action_layers = []
+
+        # index the actions by precondition and count the preconditions each action
+        # is still missing, so that every extension only visits the actions that
+        # need one of the literals added by the previous extension
+        self._consumers = defaultdict(list)
+        self._missing = {}
+        for action in self._actionNodes:
+            self._missing[action] = len(action.preconditions)
+            for literal in action.preconditions:
+                self._consumers[literal].append(action)
+        self._enabled = [a for a in self._actionNodes if not a.preconditions] + self._enable(layer)
         
     def LevelCost(self, literal_layers, goal):    
         """
@@ -408,6 +424,18 @@ class PlanningGraph:
             maxlevels -= 1
         return self
 
+    def _enable(self, literals):
+        """ Count the new literals off the preconditions of the actions that need them,
+        and return the actions that have all of their preconditions as a result
+        """
+        enabled = []
+        for literal in literals:
+            for action in self._consumers.get(literal, ()):
+                self._missing[action] -= 1
+                if self._missing[action] == 0:
+                    enabled.append(action)
+        return enabled
+
     def _extend(self):
         """ Extend the planning graph by adding both a new action layer and a new literal layer
 
@@ -416,6 +444,10 @@ class PlanningGraph:
 
         The new literal layer contains all literals that could result from taking each possible
         action in the NEW action layer.
+
+        Layers grow monotonically, so only the actions enabled by the literals that were new in
+        the parent literal layer are added, and the graph has leveled off once a literal layer
+        has the same number of literals and of mutex pairs as its parent.
         """
         if self._is_leveled: return
 
@@ -424,24 +456,28 @@ class PlanningGraph:
         action_layer = ActionLayer(parent_actions, parent_literals, self._serialize, self._ignore_mutexes)
         literal_layer = LiteralLayer(parent_literals, action_layer, self._ignore_mutexes)
 
-        for action in self._actionNodes:
-            # actions in the parent layer are skipped because are added monotonically to planning graphs,
-            # which is performed automatically in the ActionLayer and LiteralLayer constructors
-            if action not in parent_actions and action.preconditions <= parent_literals:
-                action_layer.add(action)
-                literal_layer |= action.effects
+        new_literals = []
+        for action in self._enabled:
+            # actions in the parent layer are added automatically by the ActionLayer and
+            # LiteralLayer constructors, since actions are added monotonically to planning graphs
+            action_layer.add(action)
+            new_literals.extend(e for e in action.effects if e not in literal_layer)
+            literal_layer |= action.effects
 
-                # add two-way edges in the graph connecting the parent layer with the new action
-                parent_literals.add_outbound_edges(action, action.preconditions)
-                action_layer.add_inbound_edges(action, action.preconditions)
+            # add two-way edges in the graph connecting the parent layer with the new action
+            parent_literals.add_outbound_edges(action, action.preconditions)
+            action_layer.add_inbound_edges(action, action.preconditions)
 
-                # # add two-way edges in the graph connecting the new literaly layer with the new action
-                action_layer.add_outbound_edges(action, action.effects)
-                literal_layer.add_inbound_edges(action, action.effects)
+            # # add two-way edges in the graph connecting the new literaly layer with the new action
+            action_layer.add_outbound_edges(action, action.effects)
+            literal_layer.add_inbound_edges(action, action.effects)
 
         action_layer.update_mutexes()
         literal_layer.update_mutexes()
         self.action_layers.append(action_layer)
         self.literal_layers.append(literal_layer)
-        self._is_leveled = literal_layer == action_layer.parent_layer
-
+        self._enabled = self._enable(new_literals)
+        # literal mutexes only ever disappear from one level to the next, so equal counts
+        # mean that the literal layer is equal to its parent
+        self._is_leveled = (len(literal_layer) == len(parent_literals)
+                            and literal_layer.mutex_count() == parent_literals.mutex_count())
@@ -1,10 +1,11 @@
 
+from collections import Counter, defaultdict, namedtuple
 from functools import lru_cache
 
 from aimacode.logic import PropKB
 from aimacode.search import Node, Problem
 
-from _utils import encode_state, decode_state
+from _utils import encode_state, encode_bits
 from my_planning_graph import PlanningGraph
 
     ##############################################################################
@@ -12,11 +13,101 @@ from my_planning_graph import PlanningGraph
     ##############################################################################
 
 
+ActionMasks = namedtuple('ActionMasks', ['precond_pos', 'precond_neg', 'effect_add', 'effect_rem'])
+ActionMasks.__doc__ = """ The preconditions and effects of an action as bitsets over the
+fluents of a planning problem (bit i stands for state_map[i]) """
+
+
+class SuccessorGenerator:
+    """ Inverted index from fluents to the actions that need them, for finding
+    the applicable actions of a state without testing every action
+
+    Every action with a positive precondition is filed under one of those
+    fluents, the one needed by the fewest other actions. Only the actions
+    filed under a fluent that is True in the state are tested; the few actions
+    without positive preconditions are always tested.
+
+    Parameters
+    ----------
+    compiled : list
+        (ActionMasks, action) pairs; applicable actions are returned in this order
+    """
+    def __init__(self, compiled):
+        uses = Counter(bit for masks, _ in compiled for bit in _bits(masks.precond_pos))
+        self._unconditional = []
+        self._by_fluent = defaultdict(list)
+        for order, (masks, action) in enumerate(compiled):
+            entry = (order, masks.precond_pos, masks.precond_neg, action)
+            if masks.precond_pos:
+                self._by_fluent[min(_bits(masks.precond_pos), key=uses.__getitem__)].append(entry)
+            else:
+                self._unconditional.append(entry)
+        self._keys = sum(self._by_fluent)
+
+    def __call__(self, state):
+        found = [entry for entry in self._unconditional if not state & entry[2]]
+        keys = state & self._keys
+        while keys:
+            bit = keys & -keys
+            keys ^= bit
+            found.extend(entry for entry in self._by_fluent[bit]
+                         if state & entry[1] == entry[1] and not state & entry[2])
+        found.sort()
+        return [entry[3] for entry in found]
+
+
+def _bits(mask):
+    """ The single-bit masks of the bits set in `mask` """
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield bit
+
+
 class BasePlanningProblem(Problem):
+    """ Planning problems search over states encoded as int bitsets, with the
+    fluent state_map[0] in the most significant bit (see _utils.encode_bits).
+
+    The actions of the problem are compiled into ActionMasks when they are
+    assigned to `actions_list`, so that `actions`, `result` and `goal_test`
+    only need a few integer operations per action, and indexed by a
+    SuccessorGenerator, so that `actions` only tests the actions that need a
+    fluent that is True in the state.
+    """
     def __init__(self, initial, goal):
         self.state_map = sorted(initial.pos + initial.neg, key=str)
+        self._fluent_bits = {f: 1 << (len(self.state_map) - 1 - idx) for idx, f in enumerate(self.state_map)}
+        self.goal_mask = self._mask(goal)
         self.initial_state_TF = encode_state(initial, self.state_map)
-        super().__init__(self.initial_state_TF, goal=goal)
+        self._actions_list = []
+        self._masks = {}
+        self._successors = SuccessorGenerator([])
+        super().__init__(encode_bits(self.initial_state_TF), goal=goal)
+
+    @property
+    def actions_list(self):
+        return self._actions_list
+
+    @actions_list.setter
+    def actions_list(self, actions):
+        self._actions_list = list(actions)
+        self._masks = {action: self._compile(action) for action in self._actions_list}
+        # actions with a precondition outside of state_map can never be applied
+        self._successors = SuccessorGenerator([
+            (self._masks[action], action) for action in self._actions_list
+            if all(f in self._fluent_bits for f in action.precond_pos | action.precond_neg)])
+
+    def _mask(self, fluents):
+        """ The bitset of the fluents in `fluents` that appear in state_map """
+        bits = 0
+        for fluent in fluents:
+            bits |= self._fluent_bits.get(fluent, 0)
+        return bits
+
+    def _compile(self, action):
+        """ The ActionMasks of an action """
+        return ActionMasks(self._mask(action.precond_pos), self._mask(action.precond_neg),
+                           self._mask(action.effect_add), self._mask(action.effect_rem))
 
     @lru_cache()
     def h_unmet_goals(self, node):
@@ -25,7 +116,7 @@ class BasePlanningProblem(Problem):
         conditions by ignoring the preconditions required for an action to be
         executed.
         """
-        return sum(1 for i, f in enumerate(self.state_map) if not node.state[i] and f in self.goal)
+        return bin(self.goal_mask & ~node.state).count('1')
 
     @lru_cache()
     def h_pg_levelsum(self, node):
@@ -73,31 +164,15 @@ class BasePlanningProblem(Problem):
 
     def actions(self, state):
         """ Return the actions that can be executed in the given state. """
-        possible_actions = []
-        fluent = decode_state(state, self.state_map)
-        for action in self.actions_list:
-            is_possible = True
-            for clause in action.precond_pos:
-                if clause not in fluent.pos:
-                    is_possible = False
-                    break
-            if not is_possible: continue
-            for clause in action.precond_neg:
-                if clause not in fluent.neg:
-                    is_possible = False
-                    break
-            if is_possible: possible_actions.append(action)
-        return possible_actions
+        return self._successors(state)
 
     def result(self, state, action):
         """ Return the state that results from executing the given action in the
         given state. The action must be one of self.actions(state).
         """
-        return tuple([
-            (f and s not in action.effect_rem) or (s in action.effect_add)
-            for f, s in zip(state, self.state_map)
-        ])
+        masks = self._masks.get(action) or self._compile(action)
+        return (state & ~masks.effect_rem) | masks.effect_add
 
-    def goal_test(self, state: str) -> bool:
+    def goal_test(self, state: int) -> bool:
         """ Test the state to see if goal is reached """
-        return all(f for f, c in zip(state, self.state_map) if c in self.goal)
+        return state & self.goal_mask == self.goal_mask
@@ -0,0 +1,88 @@
+import unittest
+
+from itertools import combinations
+
+from aimacode.utils import expr
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+from my_planning_graph import PlanningGraph, LiteralLayer, ActionLayer
+
+
+def pairwise_action_mutex(layer, actionA, actionB):
+    """ The mutex rules of BaseActionLayer, tested one pair at a time """
+    if layer._serialize and not actionA.no_op and not actionB.no_op:
+        return True
+    if layer._inconsistent_effects(actionA, actionB) or layer._interference(actionA, actionB):
+        return True
+    return not layer._ignore_mutexes and layer._competing_needs(actionA, actionB)
+
+
+def pairwise_literal_mutex(layer, literalA, literalB):
+    """ The mutex rules of BaseLiteralLayer, tested one pair at a time """
+    if layer._negation(literalA, literalB):
+        return True
+    return (not layer._ignore_mutexes and len(layer.parent_layer) > 0
+            and layer._inconsistent_support(literalA, literalB))
+
+
+class TestBitMatrixMutexes(unittest.TestCase):
+    def assertMatchesPairwise(self, graph):
+        for layer in graph.action_layers:
+            for a, b in combinations(layer, 2):
+                self.assertEqual(layer.is_mutex(a, b), pairwise_action_mutex(layer, a, b), (a, b))
+                self.assertEqual(layer.is_mutex(a, b), layer.is_mutex(b, a))
+        for layer in graph.literal_layers:
+            for a, b in combinations(layer, 2):
+                self.assertEqual(layer.is_mutex(a, b), pairwise_literal_mutex(layer, a, b), (a, b))
+
+    def test_matches_pairwise_rules(self):
+        for problem in (have_cake(), air_cargo_p1(), air_cargo_p2()):
+            for serialize in (True, False):
+                for ignore_mutexes in (True, False):
+                    graph = PlanningGraph(problem, problem.initial, serialize, ignore_mutexes).fill()
+                    self.assertMatchesPairwise(graph)
+
+    def test_set_and_layer_numbering(self):
+        X, Y, Z = expr('X'), expr('Y'), expr('Z')
+        layer = LiteralLayer([X, ~X, Y], ActionLayer())
+        layer.update_mutexes()
+        self.assertTrue(layer.is_mutex(X, ~X))
+        self.assertFalse(layer.is_mutex(X, Y))
+        self.assertFalse(layer.is_mutex(X, Z))
+
+        child = LiteralLayer(layer, ActionLayer())
+        child |= [Z, Y]
+        self.assertEqual(len(child), 4)
+        self.assertEqual(set(child), {X, ~X, Y, Z})
+        # mutexes belong to a level, and are not copied into a new layer
+        self.assertFalse(child.is_mutex(X, ~X))
+        child.set_mutex(Z, ~Z)      # items outside of the layer may be mutex too
+        self.assertTrue(child.is_mutex(~Z, Z))
+        self.assertNotIn(~Z, child)
+        child.discard(Y)
+        self.assertEqual(set(child), {X, ~X, Z})
+
+
+
+class TestIncrementalExtension(unittest.TestCase):
+    def test_layers_match_full_scan(self):
+        for problem in (have_cake(), air_cargo_p1(), air_cargo_p2()):
+            for serialize, ignore_mutexes in ((True, True), (True, False), (False, False)):
+                graph = PlanningGraph(problem, problem.initial, serialize, ignore_mutexes).fill()
+                for literals, actions in zip(graph.literal_layers, graph.action_layers):
+                    self.assertEqual(set(actions), {a for a in graph._actionNodes if a.preconditions <= literals})
+                # the graph levels off at the first literal layer equal to its parent
+                layers = graph.literal_layers
+                self.assertEqual(layers[-1], layers[-2])
+                for parent, child in zip(layers[:-2], layers[1:-1]):
+                    self.assertNotEqual(child, parent)
+
+    def test_extend_after_leveled(self):
+        problem = have_cake()
+        graph = PlanningGraph(problem, problem.initial).fill()
+        levels = len(graph.literal_layers)
+        graph._extend()
+        self.assertEqual(len(graph.literal_layers), levels)
+
+if __name__ == '__main__':
+    unittest.main()
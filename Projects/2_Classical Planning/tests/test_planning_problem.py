@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from aimacode.search import Node, breadth_first_search
+from _utils import FluentState, create_expressions, decode_bits, decode_state, encode_bits, make_relations
+from air_cargo_problems import AirCargoProblem, air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+
+
+def reference_actions(problem, state):
+    """ Applicable actions, tested fluent by fluent on the decoded state """
+    fluent = decode_state(decode_bits(state, problem.state_map), problem.state_map)
+    return [a for a in problem.actions_list
+            if all(c in fluent.pos for c in a.precond_pos) and all(c in fluent.neg for c in a.precond_neg)]
+
+
+def reference_result(problem, state, action):
+    return encode_bits([(f and s not in action.effect_rem) or (s in action.effect_add)
+                        for f, s in zip(decode_bits(state, problem.state_map), problem.state_map)])
+
+
+def random_walk(problem, steps, rng):
+    state = problem.initial
+    for _ in range(steps):
+        yield state
+        actions = problem.actions(state)
+        if not actions:
+            return
+        state = problem.result(state, rng.choice(actions))
+
+
+class TestBitsetStates(unittest.TestCase):
+    def test_encode_decode(self):
+        problem = air_cargo_p1()
+        self.assertEqual(decode_bits(problem.initial, problem.state_map), problem.initial_state_TF)
+        self.assertEqual(encode_bits(problem.initial_state_TF), problem.initial)
+
+    def test_order_matches_tuples(self):
+        # searches break ties on Node.state, so the bitsets must order like the tuples
+        rng = random.Random(2)
+        problem = air_cargo_p1()
+        states = [decode_bits(state, problem.state_map) for state in random_walk(problem, 100, rng)]
+        self.assertEqual(sorted(states), [decode_bits(s, problem.state_map)
+                                          for s in sorted(encode_bits(state) for state in states)])
+
+    def test_matches_fluent_semantics(self):
+        rng = random.Random(0)
+        for problem in (have_cake(), air_cargo_p1(), air_cargo_p2()):
+            for state in random_walk(problem, 200, rng):
+                actions = problem.actions(state)
+                self.assertEqual(actions, reference_actions(problem, state))
+                for action in actions:
+                    self.assertEqual(problem.result(state, action), reference_result(problem, state, action))
+                goals = [decode_bits(state, problem.state_map)[i]
+                         for i, f in enumerate(problem.state_map) if f in problem.goal]
+                self.assertEqual(problem.goal_test(state), all(goals))
+                self.assertEqual(problem.h_unmet_goals(Node(state)), goals.count(False))
+
+    def test_successor_generator(self):
+        cargos, planes, airports = ['C1', 'C2', 'C3', 'C4', 'C5'], ['P1', 'P2', 'P3'], ['A1', 'A2', 'A3', 'A4']
+        relations = make_relations('At', cargos + planes, airports) + make_relations('In', cargos, planes)
+        pos = create_expressions(['At(C1, A1)', 'At(C2, A1)', 'At(C3, A2)', 'At(C4, A3)', 'At(C5, A4)',
+                                  'At(P1, A1)', 'At(P2, A2)', 'At(P3, A2)'])
+        problem = AirCargoProblem(cargos, planes, airports,
+                                  FluentState(pos, [r for r in relations if r not in pos]),
+                                  create_expressions(['At(C1, A4)']))
+        rng = random.Random(1)
+        for state in random_walk(problem, 300, rng):
+            self.assertEqual(problem.actions(state), reference_actions(problem, state))
+
+    def test_negative_preconditions(self):
+        problem = have_cake()
+        self.assertEqual([str(a) for a in problem.actions(problem.initial)], ['Eat(Cake,)'])
+        eaten = problem.result(problem.initial, problem.actions(problem.initial)[0])
+        self.assertEqual([str(a) for a in problem.actions(eaten)], ['Bake(Cake,)'])
+
+    def test_search(self):
+        node = breadth_first_search(air_cargo_p1())
+        self.assertEqual(len(node.solution()), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()